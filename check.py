@@ -12,28 +12,34 @@ if env_file.exists():
     print("Contents:")
     print("="*60)
     
-    with open(env_file, 'r') as f:
-        content = f.read()
-        print(content)
+    content = env_file.read_text()
+    print(content)
     
     print("="*60)
     
+    # Scan once for both the truncation marker and the key line
+    has_ellipsis = False
+    key = None
+    for line in content.splitlines():
+        if '...' in line:
+            has_ellipsis = True
+        if key is None and 'GEMINI_API_KEY' in line:
+            _, sep, value = line.partition('=')
+            if sep:
+                key = value.strip()
+    
     # Check for issues
-    if "..." in content:
+    if has_ellipsis:
         print("❌ ERROR: Your .env file contains '...' (truncated API key!)")
         print("   You need to put the FULL API key, not abbreviated")
     elif len(content.strip()) < 10:
         print("❌ ERROR: .env file is too short or empty")
-    else:
-        # Extract key
-        for line in content.split('\n'):
-            if 'GEMINI_API_KEY' in line:
-                key = line.split('=')[1].strip()
-                print(f"API Key length: {len(key)} characters")
-                if len(key) < 30:
-                    print("❌ ERROR: API key is too short!")
-                else:
-                    print(f"✅ API key looks correct: {key[:10]}...{key[-5:]}")
+    elif key is not None:
+        print(f"API Key length: {len(key)} characters")
+        if len(key) < 30:
+            print("❌ ERROR: API key is too short!")
+        else:
+            print(f"✅ API key looks correct: {key[:10]}...{key[-5:]}")
 else:
     print("❌ .env file not found!")
     print("Create it with:")
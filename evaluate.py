@@ -4,10 +4,48 @@ Evaluates model performance on test set with multiple metrics
 """
 
 import sys
+import re
 import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
 import numpy as np
+import torch
+from accelerate.utils import find_executable_batch_size
+from tqdm import tqdm
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Optional metric libraries, imported once
+try:
+    import bleuscore
+    BLEUSCORE_AVAILABLE = True
+except ImportError:
+    BLEUSCORE_AVAILABLE = False
+
+try:
+    from sacrebleu import corpus_bleu
+    SACREBLEU_AVAILABLE = True
+except ImportError:
+    SACREBLEU_AVAILABLE = False
+
+try:
+    from nltk.stem import porter
+    from rouge_score import rouge_scorer, tokenizers
+    ROUGE_AVAILABLE = True
+except ImportError:
+    ROUGE_AVAILABLE = False
 
 # Add src to path
 sys.path.append(str(Path(__file__).parent / "src"))
@@ -17,15 +55,46 @@ from src.data_preprocessing import CodeDataProcessor
 from src.model import ModelEvaluator
 from config import config
 
+ROUGE_KEYS = ('rouge1', 'rouge2', 'rougeL')
+# Below this many pairs, starting worker processes costs more than it saves
+ROUGE_PARALLEL_MIN_SAMPLES = 200
+
+# rouge_score's default tokenization (lowercase, alphanumeric runs, Porter stem for len > 3)
+_ROUGE_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+if ROUGE_AVAILABLE:
+    class _RougeTokenizer(tokenizers.Tokenizer):
+        """Default ROUGE tokenization with a precompiled pattern and memoized stems"""
+
+        def __init__(self):
+            self._stem = lru_cache(maxsize=65536)(porter.PorterStemmer().stem)
+
+        def tokenize(self, text):
+            return [self._stem(token) if len(token) > 3 else token
+                    for token in _ROUGE_TOKEN_RE.findall(text.lower())]
+
+    # Built once per process (worker processes build their own on import)
+    _ROUGE_SCORER = rouge_scorer.RougeScorer(list(ROUGE_KEYS), tokenizer=_RougeTokenizer())
+else:
+    _ROUGE_SCORER = None
+
+
+def _rouge_fmeasures(pair) -> tuple:
+    """ROUGE F1 scores for one (reference, prediction) pair"""
+    reference, prediction = pair
+    scores = _ROUGE_SCORER.score(reference, prediction)
+    return tuple(scores[key].fmeasure for key in ROUGE_KEYS)
+
 
 class ComprehensiveEvaluator:
     """Comprehensive evaluation with multiple metrics"""
 
-    def __init__(self, assistant: CodeAssistant):
+    def __init__(self, assistant: CodeAssistant, batch_size: int = 16):
         self.assistant = assistant
+        self.batch_size = batch_size
 
-    def evaluate_on_test_set(self, test_data: List[Dict]) -> Dict:
-        """Evaluate model on test set"""
+    def evaluate_on_test_set(self, test_data: Sequence[Dict]) -> Dict:
+        """Evaluate model on test set (a list of samples or a HuggingFace Dataset)"""
         print("\n" + "="*60)
         print("EVALUATING MODEL ON TEST SET")
         print("="*60)
@@ -38,48 +107,69 @@ class ComprehensiveEvaluator:
 
         all_predictions = []
         all_references = []
+        all_predictions_lower = []
+        all_references_lower = []
 
         print(f"\nProcessing {len(test_data)} test samples...")
 
-        for i, sample in enumerate(test_data):
-            if i % 10 == 0:
-                print(f"Progress: {i}/{len(test_data)}")
-
+        # Group inputs/references by task in a single streaming pass, so each task
+        # is generated in batches without holding every sample dict in memory
+        codes_by_task = {task: [] for task in results_by_task}
+        references_by_task = {task: [] for task in results_by_task}
+        for sample in test_data:
             task = sample.get("task", "explain")
-            code = sample["input"]
-            reference = sample["output"]
-
-            # Generate prediction
-            if task == "explain":
-                prediction = self.assistant.explain_code(code)
-            elif task == "document":
-                prediction = self.assistant.generate_documentation(code)
-            elif task == "fix_bug":
-                result = self.assistant.fix_bug(code)
-                prediction = result["fixed_code"]
-            else:
-                prediction = self.assistant.explain_code(code)
-
-            all_predictions.append(prediction)
-            all_references.append(reference)
-
-            # Store by task
-            results_by_task[task].append({
-                "input": code,
-                "prediction": prediction,
-                "reference": reference
-            })
-
-        # Calculate metrics
-        metrics = self._calculate_metrics(all_predictions, all_references)
+            task = task if task in codes_by_task else "explain"
+            codes_by_task[task].append(sample["input"])
+            references_by_task[task].append(sample["output"])
+
+        for task, codes in codes_by_task.items():
+            if not codes:
+                continue
+            predictions = self._predict(task, codes)
+
+            for code, reference, prediction in zip(codes, references_by_task[task], predictions):
+                # Lowercase once; reused by the overall and the task metrics
+                prediction_lower = prediction.lower()
+                reference_lower = reference.lower()
+
+                all_predictions.append(prediction)
+                all_references.append(reference)
+                all_predictions_lower.append(prediction_lower)
+                all_references_lower.append(reference_lower)
+
+                # Store by task
+                results_by_task[task].append({
+                    "input": code,
+                    "prediction": prediction,
+                    "reference": reference,
+                    "prediction_lower": prediction_lower,
+                    "reference_lower": reference_lower
+                })
+
+        # One ROUGE worker pool shared by the overall and the task metrics
+        rouge_pool = None
+        if ROUGE_AVAILABLE and len(all_predictions) >= ROUGE_PARALLEL_MIN_SAMPLES:
+            rouge_pool = ProcessPoolExecutor()
 
-        # Task-specific metrics
-        task_metrics = {}
-        for task, results in results_by_task.items():
-            if results:
-                preds = [r["prediction"] for r in results]
-                refs = [r["reference"] for r in results]
-                task_metrics[task] = self._calculate_metrics(preds, refs)
+        try:
+            # Calculate metrics
+            metrics = self._calculate_metrics(all_predictions, all_references,
+                                              all_predictions_lower, all_references_lower,
+                                              rouge_pool=rouge_pool)
+
+            # Task-specific metrics
+            task_metrics = {}
+            for task, results in results_by_task.items():
+                if results:
+                    preds = [r["prediction"] for r in results]
+                    refs = [r["reference"] for r in results]
+                    preds_lower = [r["prediction_lower"] for r in results]
+                    refs_lower = [r["reference_lower"] for r in results]
+                    task_metrics[task] = self._calculate_metrics(preds, refs, preds_lower, refs_lower,
+                                                                 rouge_pool=rouge_pool)
+        finally:
+            if rouge_pool is not None:
+                rouge_pool.shutdown()
 
         return {
             "overall_metrics": metrics,
@@ -87,54 +177,101 @@ class ComprehensiveEvaluator:
             "num_samples": len(test_data)
         }
 
-    def _calculate_metrics(self, predictions: List[str], references: List[str]) -> Dict:
-        """Calculate evaluation metrics"""
+    def _predict(self, task: str, codes: List[str]) -> List[str]:
+        """Generate predictions for one task in batches, halving the batch size on OOM"""
+        # Generate each distinct input once (decoding is deterministic) and scatter back
+        all_codes = codes
+        codes = list(dict.fromkeys(all_codes))
+
+        @find_executable_batch_size(starting_batch_size=self.batch_size)
+        def generate(batch_size):
+            predictions = []
+            with tqdm(total=len(codes), desc=f"Generating {task}", mininterval=0.5, smoothing=0.1) as progress:
+                for start in range(0, len(codes), batch_size):
+                    batch = codes[start:start + batch_size]
+                    if task == "document":
+                        predictions.extend(self.assistant.generate_documentation_batch(batch, batch_size=batch_size))
+                    elif task == "fix_bug":
+                        results = self.assistant.fix_bug_batch(batch, batch_size=batch_size)
+                        predictions.extend(result["fixed_code"] for result in results)
+                    else:
+                        predictions.extend(self.assistant.explain_code_batch(batch, batch_size=batch_size))
+                    progress.update(len(batch))
+            return predictions
+
+        with torch.inference_mode():
+            predictions = generate()
+
+        if len(codes) == len(all_codes):
+            return predictions
+        prediction_by_code = dict(zip(codes, predictions))
+        return [prediction_by_code[code] for code in all_codes]
+
+    def _calculate_metrics(self, predictions: List[str], references: List[str],
+                           predictions_lower: Optional[List[str]] = None,
+                           references_lower: Optional[List[str]] = None,
+                           rouge_pool: Optional[ProcessPoolExecutor] = None) -> Dict:
+        """Calculate evaluation metrics (lowercased copies may be passed in if already computed)"""
         metrics = {}
 
-        # Length metrics
-        pred_lengths = [len(p.split()) for p in predictions]
-        ref_lengths = [len(r.split()) for r in references]
-
-        metrics["avg_prediction_length"] = np.mean(pred_lengths)
-        metrics["avg_reference_length"] = np.mean(ref_lengths)
-        metrics["length_ratio"] = np.mean(pred_lengths) / np.mean(ref_lengths)
+        if predictions_lower is None:
+            predictions_lower = [p.lower() for p in predictions]
+        if references_lower is None:
+            references_lower = [r.lower() for r in references]
 
-        # Token overlap (simple measure)
-        overlaps = []
-        for pred, ref in zip(predictions, references):
-            pred_tokens = set(pred.lower().split())
-            ref_tokens = set(ref.lower().split())
-            if ref_tokens:
-                overlap = len(pred_tokens & ref_tokens) / len(ref_tokens)
-                overlaps.append(overlap)
+        # Split once and share the tokens between length and overlap metrics
+        pred_tokens = [p.split() for p in predictions_lower]
+        ref_tokens = [r.split() for r in references_lower]
 
-        metrics["avg_token_overlap"] = np.mean(overlaps) if overlaps else 0
-
-        # Try to calculate BLEU if available
+        # Length metrics
+        pred_lengths = np.fromiter((len(t) for t in pred_tokens), dtype=np.int32, count=len(pred_tokens))
+        ref_lengths = np.fromiter((len(t) for t in ref_tokens), dtype=np.int32, count=len(ref_tokens))
+
+        avg_pred_length = float(pred_lengths.mean())
+        avg_ref_length = float(ref_lengths.mean())
+        metrics["avg_prediction_length"] = avg_pred_length
+        metrics["avg_reference_length"] = avg_ref_length
+        metrics["length_ratio"] = avg_pred_length / avg_ref_length
+
+        # Token overlap (simple measure), collected into a preallocated buffer
+        overlaps = np.empty(len(references))
+        n_overlaps = 0
+        for pred, ref in zip(pred_tokens, ref_tokens):
+            ref_set = set(ref)
+            if ref_set:
+                overlaps[n_overlaps] = len(ref_set.intersection(pred)) / len(ref_set)
+                n_overlaps += 1
+
+        metrics["avg_token_overlap"] = overlaps[:n_overlaps].mean() if n_overlaps else 0
+
+        # Calculate BLEU if available (Rust-backed bleuscore, else sacrebleu)
+        metrics["bleu_score"] = None
         try:
-            from sacrebleu import corpus_bleu
-            bleu = corpus_bleu(predictions, [references])
-            metrics["bleu_score"] = bleu.score
+            if BLEUSCORE_AVAILABLE:
+                bleu = bleuscore.compute(predictions=predictions,
+                                         references=[[r] for r in references])
+                metrics["bleu_score"] = bleu["bleu"] * 100  # Same 0-100 scale as sacrebleu
+            elif SACREBLEU_AVAILABLE:
+                metrics["bleu_score"] = corpus_bleu(predictions, [references]).score
         except:
-            metrics["bleu_score"] = None
-
-        # Try to calculate ROUGE if available
-        try:
-            from rouge_score import rouge_scorer
-            scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
-
-            rouge_scores = {'rouge1': [], 'rouge2': [], 'rougeL': []}
-            for pred, ref in zip(predictions, references):
-                scores = scorer.score(ref, pred)
-                for key in rouge_scores:
-                    rouge_scores[key].append(scores[key].fmeasure)
+            pass
+
+        # Calculate ROUGE if available. Stemming and LCS are pure Python
+        # (GIL-bound), so large sets are scored on the caller's worker pool.
+        for key in ROUGE_KEYS:
+            metrics[f"{key}_f1"] = None
+        if ROUGE_AVAILABLE:
+            try:
+                pairs = list(zip(references, predictions))
+                if rouge_pool is not None and len(pairs) >= ROUGE_PARALLEL_MIN_SAMPLES:
+                    rouge_scores = np.array(list(rouge_pool.map(_rouge_fmeasures, pairs, chunksize=16)))
+                else:
+                    rouge_scores = np.array([_rouge_fmeasures(pair) for pair in pairs])
 
-            for key in rouge_scores:
-                metrics[f"{key}_f1"] = np.mean(rouge_scores[key])
-        except:
-            metrics["rouge1_f1"] = None
-            metrics["rouge2_f1"] = None
-            metrics["rougeL_f1"] = None
+                for col, key in enumerate(ROUGE_KEYS):
+                    metrics[f"{key}_f1"] = rouge_scores[:, col].mean()
+            except Exception as e:
+                print(f"ROUGE scoring failed: {e}")
 
         return metrics
 
@@ -186,19 +323,38 @@ class ComprehensiveEvaluator:
 
             print(f"\nGenerated Output:\n{output}")
 
-            # Check for expected keywords
-            output_lower = output.lower()
-            found_keywords = [kw for kw in example['expected_keywords']
-                            if kw in output_lower]
-
-            print(f"\nExpected Keywords: {example['expected_keywords']}")
+            # Check for expected keywords: each list position has its own bit, so a
+            # repeated keyword sets all of its bits and still counts toward len(keywords)
+            keywords = example['expected_keywords']
+            keyword_bits = {}
+            for bit, kw in enumerate(keywords):
+                keyword_bits[kw] = keyword_bits.get(kw, 0) | (1 << bit)
+            mask = 0
+            if AHOCORASICK_AVAILABLE:
+                # Aho-Corasick automaton also reports keywords nested in other keywords
+                automaton = ahocorasick.Automaton()
+                for kw, bits in keyword_bits.items():
+                    automaton.add_word(kw, bits)
+                automaton.make_automaton()
+                for _, bits in automaton.iter(output.lower()):
+                    mask |= bits
+            else:
+                # Plain substring tests, so overlapping/nested keywords all count
+                output_lower = output.lower()
+                for kw, bits in keyword_bits.items():
+                    if kw in output_lower:
+                        mask |= bits
+            found_keywords = [kw for bit, kw in enumerate(keywords) if mask >> bit & 1]
+            num_found = bin(mask).count("1")
+
+            print(f"\nExpected Keywords: {keywords}")
             print(f"Found Keywords: {found_keywords}")
-            print(f"Coverage: {len(found_keywords)}/{len(example['expected_keywords'])}")
+            print(f"Coverage: {num_found}/{len(keywords)}")
 
             results.append({
                 "example": i,
                 "task": example['task'],
-                "keyword_coverage": len(found_keywords) / len(example['expected_keywords']),
+                "keyword_coverage": num_found / len(keywords),
                 "output": output
             })
 
@@ -238,8 +394,13 @@ def print_evaluation_report(results: Dict):
 
 def save_evaluation_results(results: Dict, output_file: str = "evaluation_results.json"):
     """Save evaluation results to JSON file"""
-    with open(output_file, 'w') as f:
-        json.dump(results, f, indent=2)
+    if ORJSON_AVAILABLE:
+        # Same indented layout; NumPy scalars in the metrics are serialized natively
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(output_file, 'w') as f:
+            json.dump(results, f, indent=2)
     print(f"\nResults saved to {output_file}")
 
 
@@ -254,6 +415,8 @@ def main():
                         help='Number of test samples to use')
     parser.add_argument('--examples-only', action='store_true',
                         help='Only evaluate on specific examples')
+    parser.add_argument('--batch-size', type=int, default=16,
+                        help='Generation batch size (halved automatically on OOM)')
 
     args = parser.parse_args()
 
@@ -265,7 +428,13 @@ def main():
     print("\nLoading model...")
     assistant = CodeAssistant(args.model_path)
 
-    evaluator = ComprehensiveEvaluator(assistant)
+    # Evaluation only generates, so run the model in half precision on GPU
+    if torch.cuda.is_available():
+        dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        assistant.model.to(dtype=dtype)
+        print(f"Using {dtype} for evaluation")
+
+    evaluator = ComprehensiveEvaluator(assistant, batch_size=args.batch_size)
 
     all_results = {}
 
@@ -279,11 +448,11 @@ def main():
             processor = CodeDataProcessor()
             test_dataset = processor.load_dataset_for_training("test")
 
-            # Limit samples if specified
+            # Limit samples if specified (select is a lazy view, rows are read while iterating)
             if args.test_samples:
-                test_data = [test_dataset[i] for i in range(min(args.test_samples, len(test_dataset)))]
+                test_data = test_dataset.select(range(min(args.test_samples, len(test_dataset))))
             else:
-                test_data = list(test_dataset)
+                test_data = test_dataset
 
             # Evaluate on test set
             test_results = evaluator.evaluate_on_test_set(test_data)
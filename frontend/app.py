@@ -6,6 +6,9 @@ With hardcoded API key
 from flask import Flask, render_template, request, jsonify
 import sys
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # ============================================================
@@ -34,6 +37,21 @@ app = Flask(__name__)
 assistant = None
 model_loaded = False
 loading_error = None
+model_lock = threading.Lock()  # Guards assistant/model_loaded/loading_error writes
+
+# Codebase indexing runs off the request thread; clients poll /api/codebase-stats
+INDEX_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+INDEX_FUTURE = None
+
+# Short-lived cache of assistant.get_codebase_stats() for polling clients
+STATS_TTL_SECONDS = 1.0
+_STATS_CACHE = {'t': 0.0, 'v': None}
+
+
+def _invalidate_stats_cache(*_):
+    """Force the next /api/codebase-stats call to refetch"""
+    _STATS_CACHE['t'] = 0.0
+    _STATS_CACHE['v'] = None
 
 
 def load_model():
@@ -50,18 +68,22 @@ def load_model():
         # Create codebase directory if it doesn't exist
         os.makedirs(codebase_path, exist_ok=True)
         
-        assistant = HybridRAGAssistant(
+        loaded_assistant = HybridRAGAssistant(
             model_path=model_path,
             codebase_dir=codebase_path
         )
         
-        model_loaded = True
+        # Publish the assistant before the flag, so readers never see loaded=True without it
+        with model_lock:
+            assistant = loaded_assistant
+            model_loaded = True
         print("✅ Model loaded successfully!")
         print(f"✅ Gemini available: {assistant.use_gemini}")
         print(f"✅ RAG enabled: {assistant.retrieval_enabled}")
         return True
     except Exception as e:
-        loading_error = str(e)
+        with model_lock:
+            loading_error = str(e)
         print(f"❌ Error loading model: {e}")
         import traceback
         traceback.print_exc()
@@ -98,7 +120,16 @@ def get_codebase_stats():
         return jsonify({'indexed': False})
     
     try:
-        stats = assistant.get_codebase_stats()
+        # Work on a local: the indexing done-callback may clear the cache concurrently
+        now = time.monotonic()
+        cached = _STATS_CACHE['v']
+        if cached is None or now - _STATS_CACHE['t'] >= STATS_TTL_SECONDS:
+            cached = assistant.get_codebase_stats()
+            _STATS_CACHE.update(t=now, v=cached)
+        stats = dict(cached)
+        stats['indexing'] = INDEX_FUTURE is not None and not INDEX_FUTURE.done()
+        if INDEX_FUTURE is not None and INDEX_FUTURE.done() and INDEX_FUTURE.exception():
+            stats['index_error'] = str(INDEX_FUTURE.exception())
         return jsonify(stats)
     except Exception as e:
         print(f"Error getting codebase stats: {e}")
@@ -107,7 +138,8 @@ def get_codebase_stats():
 
 @app.route('/api/index-codebase', methods=['POST'])
 def index_codebase():
-    """Index user's codebase for RAG"""
+    """Save the submitted code and start indexing it in the background (202)"""
+    global INDEX_FUTURE
     if not model_loaded:
         return jsonify({
             'success': False,
@@ -127,19 +159,21 @@ def index_codebase():
             
             # Save to user_code.py (overwrite if exists)
             user_code_file = codebase_path / "user_code.py"
-            with open(user_code_file, 'w', encoding='utf-8') as f:
-                f.write(code)
+            user_code_file.write_text(code, encoding='utf-8')
             print(f"✅ Code saved to {user_code_file}")
         
-        print("🔍 Indexing codebase...")
-        assistant.index_codebase(force_reindex=True)
-        
-        stats = assistant.get_codebase_stats()
+        # Always queue a job: a run already in progress may have read the old file.
+        # The executor has a single worker, so jobs run in submission order.
+        print("🔍 Indexing codebase in the background...")
+        INDEX_FUTURE = INDEX_EXECUTOR.submit(assistant.index_codebase, force_reindex=True)
+        # Drop cached stats now and again once the new index is in place
+        _invalidate_stats_cache()
+        INDEX_FUTURE.add_done_callback(_invalidate_stats_cache)
         
         return jsonify({
             'success': True,
-            'stats': stats
-        })
+            'status': 'indexing'
+        }), 202
     except Exception as e:
         print(f"Error indexing codebase: {e}")
         import traceback
@@ -150,6 +184,50 @@ def index_codebase():
         }), 500
 
 
+def _fix_result(fix_result: dict) -> dict:
+    """Shape a fix_bug result for the UI"""
+    return {
+        'output': fix_result['fixed_code'],
+        'explanation': fix_result.get('explanation', ''),
+        'method': fix_result.get('method', ''),
+        'type': 'code'
+    }
+
+
+def _optimize_result(opt_result: dict) -> dict:
+    """Shape an optimize_code result for the UI"""
+    return {
+        'output': opt_result['optimized_code'],
+        'suggestions': opt_result.get('suggestions', []),
+        'method': opt_result.get('method', ''),
+        'type': 'code'
+    }
+
+
+def _test_result(tests: list) -> dict:
+    """Shape a generate_tests result for the UI"""
+    return {
+        'output': tests[0] if tests else 'No tests generated',
+        'type': 'code'
+    }
+
+
+# (feature, use codebase context) -> handler; the handlers look up the global
+# assistant when called, so the table can be built before the model loads
+FEATURE_HANDLERS = {
+    ('explain', True): lambda code: {'output': assistant.explain_code_with_context(code, detailed=True), 'type': 'text'},
+    ('explain', False): lambda code: {'output': assistant.explain_code(code, detailed=True), 'type': 'text'},
+    ('document', True): lambda code: {'output': assistant.explain_code_with_context(code, detailed=False), 'type': 'text'},
+    ('document', False): lambda code: {'output': assistant.generate_documentation(code), 'type': 'text'},
+    ('fix', True): lambda code: _fix_result(assistant.fix_bug_with_context(code)),
+    ('fix', False): lambda code: _fix_result(assistant.fix_bug(code)),
+    ('optimize', True): lambda code: _optimize_result(assistant.optimize_code_with_context(code)),
+    ('optimize', False): lambda code: _optimize_result(assistant.optimize_code(code)),
+    ('test', True): lambda code: _test_result(assistant.generate_tests(code)),
+    ('test', False): lambda code: _test_result(assistant.generate_tests(code)),
+}
+
+
 @app.route('/api/process', methods=['POST'])
 def process_code():
     """Process code with selected feature"""
@@ -171,55 +249,15 @@ def process_code():
                 'error': 'No code provided'
             }), 400
         
-        result = {}
-        
-        if feature == 'explain':
-            if assistant.retrieval_enabled and use_context:
-                result['output'] = assistant.explain_code_with_context(code, detailed=True)
-            else:
-                result['output'] = assistant.explain_code(code, detailed=True)
-            result['type'] = 'text'
-            
-        elif feature == 'document':
-            if assistant.retrieval_enabled and use_context:
-                result['output'] = assistant.explain_code_with_context(code, detailed=False)
-            else:
-                result['output'] = assistant.generate_documentation(code)
-            result['type'] = 'text'
-            
-        elif feature == 'fix':
-            if assistant.retrieval_enabled and use_context:
-                fix_result = assistant.fix_bug_with_context(code)
-            else:
-                fix_result = assistant.fix_bug(code)
-            
-            result['output'] = fix_result['fixed_code']
-            result['explanation'] = fix_result.get('explanation', '')
-            result['method'] = fix_result.get('method', '')
-            result['type'] = 'code'
-            
-        elif feature == 'optimize':
-            if assistant.retrieval_enabled and use_context:
-                opt_result = assistant.optimize_code_with_context(code)
-            else:
-                opt_result = assistant.optimize_code(code)
-            
-            result['output'] = opt_result['optimized_code']
-            result['suggestions'] = opt_result.get('suggestions', [])
-            result['method'] = opt_result.get('method', '')
-            result['type'] = 'code'
-            
-        elif feature == 'test':
-            tests = assistant.generate_tests(code)
-            result['output'] = tests[0] if tests else 'No tests generated'
-            result['type'] = 'code'
-            
-        else:
+        handler = FEATURE_HANDLERS.get((feature, bool(assistant.retrieval_enabled and use_context)))
+        if handler is None:
             return jsonify({
                 'success': False,
                 'error': 'Invalid feature selected'
             }), 400
         
+        result = handler(code)
+        
         return jsonify({
             'success': True,
             'result': result
@@ -239,7 +277,8 @@ if __name__ == '__main__':
     print("🚀 AI CODE ASSISTANT - WEB INTERFACE")
     print("="*60 + "\n")
     
-    load_model()
+    # Load in the background so /api/status answers (loaded=False) while the model loads
+    threading.Thread(target=load_model, daemon=True).start()
     
     print("\n" + "="*60)
     print("🌐 Starting web server...")
@@ -2,8 +2,13 @@
 Check actual .env file content byte by byte
 """
 
+import io
+import os
+import re
 from pathlib import Path
 
+from dotenv import dotenv_values
+
 env_file = Path(".env")
 
 print("="*60)
@@ -24,25 +29,27 @@ print(repr(text))
 print(f"\nLines:")
 for i, line in enumerate(text.split('\n'), 1):
     print(f"  Line {i}: {repr(line)}")
-    if 'GEMINI_API_KEY' in line:
-        if '=' in line:
-            key = line.split('=', 1)[1].strip()
-            print(f"    -> Key extracted: '{key}'")
-            print(f"    -> Key length: {len(key)}")
-            print(f"    -> Contains '...': {'...' in key}")
+
+print(f"\nGEMINI_API_KEY entries:")
+for match in re.finditer(r'(?m)^.*GEMINI_API_KEY[^=\n]*=(.*)$', text):
+    key = match.group(1).strip()
+    print(f"  -> Key extracted: '{key}'")
+    print(f"  -> Key length: {len(key)}")
+    print(f"  -> Contains '...': {'...' in key}")
 
 print("="*60)
 
-# Now test with dotenv
+# Now test with dotenv, parsing the text already read instead of reopening the file
 print("\nTesting with python-dotenv:")
-from dotenv import load_dotenv
-import os
 
 # Clear any existing value
 if 'GEMINI_API_KEY' in os.environ:
     del os.environ['GEMINI_API_KEY']
 
-load_dotenv(dotenv_path=env_file)
+# Same semantics as load_dotenv(): existing variables are not overridden
+for name, value in dotenv_values(stream=io.StringIO(text)).items():
+    if value is not None:
+        os.environ.setdefault(name, value)
 loaded_key = os.getenv('GEMINI_API_KEY')
 
 print(f"Loaded key: {repr(loaded_key)}")
@@ -4,13 +4,50 @@ Allows AI to retrieve similar code from user's codebase for context-aware sugges
 """
 
 import os
-import json
+import ast
+import hashlib
+import math
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Tuple
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
+from transformers import AutoTokenizer
 import faiss
 
+# Let the Rust tokenizer use all cores when encoding snippet batches
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
+# Codebases at least this large use an HNSW graph instead of an exact flat scan
+HNSW_MIN_SNIPPETS = 10000
+HNSW_M = 32  # Graph neighbours per node
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64  # Candidate list size per query (recall vs. latency)
+
+# Beyond this HNSW's per-vector memory dominates, so compress with IVF-PQ
+IVF_MIN_SNIPPETS = 1000000
+IVF_NPROBE = 8  # Voronoi cells visited per query
+PQ_SUBQUANTIZERS = 64  # Bytes per stored vector (must divide the embedding dimension)
+
+
+def _iter_py_files(root: str):
+    """Yield paths of all .py files under root (os.scandir, no per-entry Path objects)"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith('.py') and entry.is_file():
+                        yield entry.path
+        except OSError as e:
+            print(f"Error scanning {directory}: {e}")
+
 
 class CodebaseRetrieval:
     """
@@ -28,28 +65,61 @@ class CodebaseRetrieval:
         """
         self.codebase_dir = Path(codebase_dir)
         self.index_file = self.codebase_dir / "faiss_index.bin"
-        self.metadata_file = self.codebase_dir / "metadata.json"
+        self.metadata_file = self.codebase_dir / "metadata.npz"
+        self.embed_cache_file = self.codebase_dir / "embed_cache.npz"
+        self.extract_cache_file = self.codebase_dir / "extract_cache.pkl"
         
         # Create codebase directory if it doesn't exist
         self.codebase_dir.mkdir(exist_ok=True)
         
+        # Encoder and FAISS index live on the GPU when one is available
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.gpu_resources = None
+        if self.device == "cuda" and hasattr(faiss, "StandardGpuResources"):
+            self.gpu_resources = faiss.StandardGpuResources()
+        
         # Load embedding model
-        print(f"Loading embedding model: {model_name}...")
+        print(f"Loading embedding model: {model_name} ({self.device})...")
         try:
-            self.embedding_model = SentenceTransformer(model_name)
+            self.embedding_model = SentenceTransformer(model_name, device=self.device)
+            self.model_name = model_name
             print("✅ Embedding model loaded")
         except Exception as e:
             print(f"⚠️ Failed to load {model_name}, falling back to simpler model...")
-            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2', device=self.device)
+            self.model_name = 'all-MiniLM-L6-v2'
             print("✅ Fallback model loaded")
         
+        # Tokenizing many short snippets is much cheaper with the Rust-backed tokenizer
+        if not getattr(self.embedding_model.tokenizer, 'is_fast', False):
+            try:
+                self.embedding_model.tokenizer = AutoTokenizer.from_pretrained(self.model_name, use_fast=True)
+                print("✅ Switched to fast tokenizer")
+            except Exception as e:
+                print(f"⚠️ Fast tokenizer unavailable, using slow tokenizer: {e}")
+        
+        # On CPU, int8 dynamic quantization of the Linear layers roughly doubles encode throughput
+        self.quantized = False
+        if self.device == "cpu":
+            try:
+                transformer = self.embedding_model[0]
+                transformer.auto_model = torch.quantization.quantize_dynamic(
+                    transformer.auto_model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                self.quantized = True
+                print("✅ Embedding model quantized to int8")
+            except Exception as e:
+                print(f"⚠️ Int8 quantization unavailable, using FP32 encoder: {e}")
+        
         # Initialize FAISS index
         self.dimension = 768  # CodeBERT dimension (or 384 for MiniLM)
         if model_name == 'all-MiniLM-L6-v2':
             self.dimension = 384
-            
-        self.index = None
-        self.metadata = []
+        
+        # Indexing runs on a background thread while requests search, so the index
+        # and its metadata columns are only ever swapped together under this lock
+        self._index_lock = threading.Lock()
+        self._clear_index()
         
         # Load existing index if available
         if self.index_file.exists() and self.metadata_file.exists():
@@ -64,14 +134,14 @@ class CodebaseRetrieval:
         Args:
             force_reindex: If True, reindex even if index exists
         """
-        if not force_reindex and self.index_file.exists():
+        if not force_reindex and self.index_file.exists() and self.metadata_file.exists():
             print("Index already exists. Use force_reindex=True to rebuild.")
             return
         
         print(f"Indexing codebase from {self.codebase_dir}...")
         
         # Find all Python files
-        python_files = list(self.codebase_dir.rglob("*.py"))
+        python_files = list(_iter_py_files(str(self.codebase_dir)))
         
         if not python_files:
             print("⚠️ No Python files found in codebase directory")
@@ -83,10 +153,27 @@ class CodebaseRetrieval:
         all_snippets = []
         all_metadata = []
         
+        # Unchanged files (same path, mtime and size) reuse their previous extraction
+        cache = self._load_extract_cache()
+        keys = []
         for file_path in python_files:
-            snippets, metadata = self._extract_functions_from_file(file_path)
+            st = os.stat(file_path)
+            keys.append((os.path.relpath(file_path, self.codebase_dir), st.st_mtime_ns, st.st_size))
+        todo = [file_path for file_path, key in zip(python_files, keys) if key not in cache]
+        print(f"Parsing {len(todo)} new or changed files ({len(python_files) - len(todo)} cached)")
+        
+        # File reads overlap across threads; results come back in file order
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+            extracted = dict(zip(todo, executor.map(self._extract_functions_from_file, todo)))
+        
+        new_cache = {}
+        for file_path, key in zip(python_files, keys):
+            result = extracted[file_path] if file_path in extracted else cache[key]
+            new_cache[key] = result
+            snippets, metadata = result
             all_snippets.extend(snippets)
             all_metadata.extend(metadata)
+        self._save_extract_cache(new_cache)
         
         if not all_snippets:
             print("⚠️ No code snippets extracted from files")
@@ -94,22 +181,152 @@ class CodebaseRetrieval:
         
         print(f"Extracted {len(all_snippets)} code snippets")
         
-        # Generate embeddings
-        print("Generating embeddings...")
-        embeddings = self.embedding_model.encode(all_snippets, show_progress_bar=True)
+        # Reuse embeddings of unchanged snippets; only cache misses hit the encoder
+        hashes = [hashlib.sha256(snippet.encode('utf-8')).hexdigest() for snippet in all_snippets]
+        cache = self._load_embed_cache()
+        todo_idx = [i for i, h in enumerate(hashes) if h not in cache]
+        
+        dim = self.embedding_model.get_sentence_embedding_dimension()
+        embeddings = np.empty((len(all_snippets), dim), dtype='float32')
+        for i, h in enumerate(hashes):
+            if h in cache:
+                embeddings[i] = cache[h]
+        
+        # Generate embeddings (encode() sorts inputs by length internally, so each
+        # batch pads to similar lengths, and restores the original order)
+        print(f"Generating embeddings ({len(todo_idx)} new, {len(hashes) - len(todo_idx)} cached)...")
+        if todo_idx:
+            embeddings[todo_idx] = self.embedding_model.encode(
+                [all_snippets[i] for i in todo_idx],
+                batch_size=64,
+                device=self.device,
+                show_progress_bar=True,
+                convert_to_numpy=True
+            )
+        self._save_embed_cache(hashes, embeddings)
         
         # Create FAISS index
         print("Building FAISS index...")
-        self.index = faiss.IndexFlatL2(self.dimension)
-        self.index.add(embeddings.astype('float32'))
-        self.metadata = all_metadata
+        faiss.normalize_L2(embeddings)  # Inner product of unit vectors = cosine similarity
+        index = self._build_index(embeddings)
+        
+        # Metadata is kept column-wise: one array per field, indexed by FAISS id
+        self._publish_index(
+            index,
+            files=[m['file'] for m in all_metadata],
+            functions=[m['function'] for m in all_metadata],
+            lines=np.fromiter((m['line'] for m in all_metadata), dtype=np.int32, count=len(all_metadata)),
+            end_lines=np.fromiter((m['end_line'] for m in all_metadata), dtype=np.int32, count=len(all_metadata)),
+            snippets=all_snippets
+        )
         
         # Save index and metadata
         self.save_index()
         
         print(f"✅ Indexed {len(all_snippets)} code snippets from {len(python_files)} files")
     
-    def _extract_functions_from_file(self, file_path: Path) -> Tuple[List[str], List[Dict]]:
+    def _publish_index(self, index, files: List[str], functions: List[str],
+                       lines: np.ndarray, end_lines: np.ndarray, snippets: List[str]):
+        """Swap in an index together with its per-snippet metadata columns"""
+        with self._index_lock:
+            self.index = index
+            self.files = files
+            self.functions = functions
+            self.lines = lines
+            self.end_lines = end_lines
+            self.snippets = snippets
+    
+    def _clear_index(self):
+        """Drop the index and reset the per-snippet metadata columns"""
+        self._publish_index(None, [], [], np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32), [])
+    
+    def _load_extract_cache(self) -> Dict[Tuple[str, int, int], Tuple[List[str], List[Dict]]]:
+        """Load per-file extraction results keyed by (relative path, mtime_ns, size)"""
+        if not self.extract_cache_file.exists():
+            return {}
+        try:
+            with open(self.extract_cache_file, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable extraction cache: {e}")
+            return {}
+    
+    def _save_extract_cache(self, cache: Dict[Tuple[str, int, int], Tuple[List[str], List[Dict]]]):
+        """Write the extraction cache atomically so an interrupted run can't corrupt it"""
+        tmp_file = self.extract_cache_file.with_name(self.extract_cache_file.name + '.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, self.extract_cache_file)
+    
+    def _embed_cache_model(self) -> str:
+        """Identify the encoder that produced cached embeddings (int8 output differs slightly)"""
+        return f"{self.model_name}:int8" if self.quantized else self.model_name
+    
+    def _load_embed_cache(self) -> Dict[str, np.ndarray]:
+        """Load cached embeddings keyed by sha256 of the snippet text"""
+        if not self.embed_cache_file.exists():
+            return {}
+        try:
+            with np.load(self.embed_cache_file) as data:
+                # Embeddings from a different model are not comparable
+                if str(data['model']) != self._embed_cache_model():
+                    return {}
+                return dict(zip(data['keys'].tolist(), data['embeddings']))
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable embedding cache: {e}")
+            return {}
+    
+    def _save_embed_cache(self, hashes: List[str], embeddings: np.ndarray):
+        """Persist raw embeddings of the current snippets (stale entries are dropped)"""
+        np.savez_compressed(
+            self.embed_cache_file,
+            model=np.array(self._embed_cache_model()),
+            keys=np.array(hashes),
+            embeddings=embeddings
+        )
+    
+    def _build_index(self, embeddings: np.ndarray):
+        """
+        Build an inner-product FAISS index over L2-normalized embeddings
+        
+        Small codebases get an exact scan over FP16-stored vectors (half the
+        memory traffic of FP32, with negligible loss for sentence embeddings). Medium ones get an IndexHNSWFlat
+        graph with logarithmic query cost and no training. Very large ones get an
+        IndexIVFPQ: vectors are clustered into ~4*sqrt(N) cells and stored as
+        64-byte codes, and each query only scans the IVF_NPROBE nearest cells.
+        """
+        n = len(embeddings)
+        if n < HNSW_MIN_SNIPPETS:
+            if self.gpu_resources is not None:
+                index = faiss.IndexFlatIP(self.dimension)  # Stored as FP16 when cloned to the GPU
+            else:
+                index = faiss.IndexScalarQuantizer(self.dimension, faiss.ScalarQuantizer.QT_fp16,
+                                                   faiss.METRIC_INNER_PRODUCT)
+        elif n < IVF_MIN_SNIPPETS:
+            index = faiss.IndexHNSWFlat(self.dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+        else:
+            nlist = int(4 * math.sqrt(n))
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            index = faiss.IndexIVFPQ(quantizer, self.dimension, nlist, PQ_SUBQUANTIZERS, 8,
+                                     faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings)
+            index.nprobe = IVF_NPROBE
+        
+        index.add(embeddings)
+        return self._to_gpu(index)
+    
+    def _to_gpu(self, index):
+        """Move a CPU index onto the GPU (no-op without CUDA or a faiss-gpu build)"""
+        # FAISS has no GPU implementation of HNSW or flat scalar quantizers
+        if self.gpu_resources is None or isinstance(index, (faiss.IndexHNSW, faiss.IndexScalarQuantizer)):
+            return index
+        options = faiss.GpuClonerOptions()
+        options.useFloat16 = True
+        return faiss.index_cpu_to_gpu(self.gpu_resources, 0, index, options)
+    
+    def _extract_functions_from_file(self, file_path: str) -> Tuple[List[str], List[Dict]]:
         """
         Extract function definitions from a Python file
         
@@ -123,66 +340,87 @@ class CodebaseRetrieval:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            # Simple function extraction (could be improved with AST parsing)
             lines = content.split('\n')
-            current_function = []
-            function_name = None
-            in_function = False
-            indent_level = 0
-            
-            for i, line in enumerate(lines):
-                # Detect function start
-                if line.strip().startswith('def ') and ':' in line:
-                    if current_function and function_name:
-                        # Save previous function
-                        snippet = '\n'.join(current_function)
-                        snippets.append(snippet)
-                        metadata.append({
-                            'file': str(file_path.relative_to(self.codebase_dir)),
-                            'function': function_name,
-                            'line': i - len(current_function) + 1,
-                            'type': 'function'
-                        })
-                    
-                    # Start new function
-                    function_name = line.strip().split('def ')[1].split('(')[0]
-                    current_function = [line]
-                    in_function = True
-                    indent_level = len(line) - len(line.lstrip())
-                
-                elif in_function:
-                    if line.strip() and not line.startswith(' ' * (indent_level + 1)) and not line.strip().startswith('#'):
-                        # Function ended
-                        snippet = '\n'.join(current_function)
-                        snippets.append(snippet)
-                        metadata.append({
-                            'file': str(file_path.relative_to(self.codebase_dir)),
-                            'function': function_name,
-                            'line': i - len(current_function) + 1,
-                            'type': 'function'
-                        })
-                        current_function = []
-                        function_name = None
-                        in_function = False
-                    else:
-                        current_function.append(line)
+            relative_file = os.path.relpath(file_path, self.codebase_dir)
+            try:
+                tree = ast.parse(content, filename=file_path)
+            except SyntaxError as e:
+                # Buggy user files are worth indexing too; fall back to the line scanner
+                print(f"⚠️ {relative_file} does not parse ({e.msg}), using indentation scan")
+                return self._extract_functions_by_indent(lines, relative_file)
             
-            # Save last function if exists
-            if current_function and function_name:
-                snippet = '\n'.join(current_function)
-                snippets.append(snippet)
-                metadata.append({
-                    'file': str(file_path.relative_to(self.codebase_dir)),
-                    'function': function_name,
-                    'line': i - len(current_function) + 2,
-                    'type': 'function'
-                })
+            # Extract every (async) function and method, including nested ones
+            for node in ast.walk(tree):
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    snippets.append('\n'.join(lines[node.lineno - 1:node.end_lineno]))
+                    metadata.append({
+                        'file': relative_file,
+                        'function': node.name,
+                        'line': node.lineno,
+                        'end_line': node.end_lineno,
+                        'type': 'function'
+                    })
         
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
         
         return snippets, metadata
     
+    @staticmethod
+    def _extract_functions_by_indent(lines: List[str], relative_file: str) -> Tuple[List[str], List[Dict]]:
+        """
+        Extract functions by scanning for 'def' lines and following their indentation
+        
+        Used for files that ast.parse rejects.
+        
+        Returns:
+            Tuple of (code_snippets, metadata)
+        """
+        snippets = []
+        metadata = []
+        current_function = []
+        function_name = None
+        start = 0
+        indent_level = 0
+        
+        def save_function():
+            snippets.append('\n'.join(current_function))
+            metadata.append({
+                'file': relative_file,
+                'function': function_name,
+                'line': start + 1,
+                'end_line': start + len(current_function),
+                'type': 'function'
+            })
+        
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            # Detect function start
+            if stripped.startswith('def ') and ':' in line:
+                if function_name:
+                    save_function()
+                
+                # Start new function
+                function_name = stripped.split('def ')[1].split('(')[0]
+                current_function = [line]
+                start = i
+                indent_level = len(line) - len(line.lstrip())
+            
+            elif function_name:
+                if stripped and not line.startswith(' ' * (indent_level + 1)) and not stripped.startswith('#'):
+                    # Function ended
+                    save_function()
+                    current_function = []
+                    function_name = None
+                else:
+                    current_function.append(line)
+        
+        # Save last function if exists
+        if function_name:
+            save_function()
+        
+        return snippets, metadata
+    
     def retrieve_similar_code(self, query_code: str, top_k: int = 3) -> List[Dict]:
         """
         Retrieve similar code snippets from the indexed codebase
@@ -194,71 +432,130 @@ class CodebaseRetrieval:
         Returns:
             List of similar code snippets with metadata
         """
-        if self.index is None or len(self.metadata) == 0:
+        return self.retrieve_similar_code_batch([query_code], top_k=top_k)[0]
+    
+    def retrieve_similar_code_batch(self, query_codes: List[str], top_k: int = 3) -> List[List[Dict]]:
+        """
+        Retrieve similar code snippets for several queries at once
+        
+        All queries are encoded together and answered by a single FAISS search.
+        
+        Args:
+            query_codes: The code snippets to find similar examples for
+            top_k: Number of similar examples to return per query
+            
+        Returns:
+            One list of similar code snippets with metadata per query
+        """
+        # Search one consistent snapshot, even if a reindex publishes meanwhile
+        with self._index_lock:
+            index, files, functions = self.index, self.files, self.functions
+            lines, end_lines, snippets = self.lines, self.end_lines, self.snippets
+        
+        if index is None or len(files) == 0:
             print("⚠️ No codebase indexed. Please run index_codebase() first.")
+            return [[] for _ in query_codes]
+        
+        if not query_codes:
             return []
         
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode([query_code])
+        # Generate query embeddings
+        query_embeddings = self.embedding_model.encode(
+            query_codes,
+            batch_size=32,
+            device=self.device,
+            convert_to_numpy=True
+        ).astype('float32')
+        
+        faiss.normalize_L2(query_embeddings)
         
         # Search FAISS index
-        distances, indices = self.index.search(query_embedding.astype('float32'), top_k)
+        if hasattr(index, 'nprobe'):
+            index.nprobe = IVF_NPROBE
+        if hasattr(index, 'hnsw'):
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+        distances, indices = index.search(query_embeddings, top_k)
         
         # Prepare results
-        results = []
-        for i, (dist, idx) in enumerate(zip(distances[0], indices[0])):
-            if idx < len(self.metadata):
-                results.append({
-                    'rank': i + 1,
-                    'similarity_score': float(1 / (1 + dist)),  # Convert distance to similarity
-                    'metadata': self.metadata[idx],
-                    'code': self._load_code_snippet(self.metadata[idx])
-                })
-        
-        return results
+        all_results = []
+        for row_distances, row_indices in zip(distances, indices):
+            results = []
+            for i, (dist, idx) in enumerate(zip(row_distances, row_indices)):
+                if 0 <= idx < len(files):  # IVF returns -1 when fewer than top_k hits
+                    metadata = {
+                        'file': files[idx],
+                        'function': functions[idx],
+                        'line': int(lines[idx]),
+                        'end_line': int(end_lines[idx]),
+                        'type': 'function'
+                    }
+                    results.append({
+                        'rank': i + 1,
+                        'similarity_score': float(dist),  # Cosine similarity
+                        'metadata': metadata,
+                        'code': snippets[idx]
+                    })
+            all_results.append(results)
+        
+        return all_results
     
-    def _load_code_snippet(self, metadata: Dict) -> str:
-        """Load the actual code snippet from file"""
-        try:
-            file_path = self.codebase_dir / metadata['file']
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                start_line = metadata['line'] - 1
-                
-                # Find function end
-                indent = len(lines[start_line]) - len(lines[start_line].lstrip())
-                end_line = start_line + 1
-                
-                while end_line < len(lines):
-                    line = lines[end_line]
-                    if line.strip() and not line.startswith(' ' * (indent + 1)):
-                        break
-                    end_line += 1
-                
-                return ''.join(lines[start_line:end_line])
-        except Exception as e:
-            print(f"Error loading snippet: {e}")
-            return ""
+    def _pack_snippets(self) -> Dict[str, np.ndarray]:
+        """Concatenate snippet text as UTF-8 with offsets (compact, unlike a fixed-width str array)"""
+        encoded = [snippet.encode('utf-8') for snippet in self.snippets]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return {
+            'snippet_bytes': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            'snippet_offsets': offsets
+        }
+    
+    @staticmethod
+    def _unpack_snippets(snippet_bytes: np.ndarray, offsets: np.ndarray) -> List[str]:
+        """Inverse of _pack_snippets"""
+        blob = snippet_bytes.tobytes()
+        bounds = offsets.tolist()
+        return [blob[start:end].decode('utf-8') for start, end in zip(bounds, bounds[1:])]
     
     def save_index(self):
         """Save FAISS index and metadata to disk"""
         if self.index is not None:
-            faiss.write_index(self.index, str(self.index_file))
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            index = self.index
+            if self.gpu_resources is not None:
+                index = faiss.index_gpu_to_cpu(index)
+            faiss.write_index(index, str(self.index_file))
+            np.savez(
+                self.metadata_file,
+                files=np.array(self.files, dtype=str),
+                functions=np.array(self.functions, dtype=str),
+                lines=self.lines,
+                end_lines=self.end_lines,
+                **self._pack_snippets()
+            )
             print(f"✅ Index saved to {self.index_file}")
     
     def load_index(self):
         """Load FAISS index and metadata from disk"""
         try:
-            self.index = faiss.read_index(str(self.index_file))
-            with open(self.metadata_file, 'r') as f:
-                self.metadata = json.load(f)
-            print(f"✅ Loaded index with {len(self.metadata)} code snippets")
+            index = faiss.read_index(str(self.index_file))
+            if index.metric_type != faiss.METRIC_INNER_PRODUCT:
+                # Saved before cosine scoring (L2 distances); rebuild so scores share one scale
+                print("⚠️ Index uses L2 distance, rebuilding with cosine similarity...")
+                self.index_codebase(force_reindex=True)
+                return
+            index = self._to_gpu(index)
+            with np.load(self.metadata_file) as data:
+                self._publish_index(
+                    index,
+                    files=data['files'].tolist(),
+                    functions=data['functions'].tolist(),
+                    lines=data['lines'],
+                    end_lines=data['end_lines'],
+                    snippets=self._unpack_snippets(data['snippet_bytes'], data['snippet_offsets'])
+                )
+            print(f"✅ Loaded index with {len(self.files)} code snippets")
         except Exception as e:
             print(f"Error loading index: {e}")
-            self.index = None
-            self.metadata = []
+            self._clear_index()
 
 
 # Example usage
@@ -84,6 +84,7 @@ class DataConfig:
 
     # Augmentation
     use_augmentation: bool = True
+    augmentation_seed: Optional[int] = None  # Set for reproducible synthetic bugs
 
 
 # Global config instance
@@ -4,17 +4,29 @@ Handles data loading, cleaning, and augmentation
 """
 
 import json
-import random
 import re
 import ast
+from itertools import chain, repeat
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
-import jsonlines
+import numpy as np
 from datasets import load_dataset, Dataset
 from tqdm import tqdm
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from config import config, data_config
 
+# Compiled once; these run for every sample
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+_IDENT_RE = re.compile(r'\b([a-z_][a-z0-9_]*)\b')
+
+# Augmentation draws are generated this many rows at a time
+AUG_BLOCK_SIZE = 4096
 
 class CodeDataProcessor:
     """Processes and prepares Python code data for training"""
@@ -22,6 +34,13 @@ class CodeDataProcessor:
     def __init__(self, config=config, data_config=data_config):
         self.config = config
         self.data_config = data_config
+        self._bug_types = (
+            self._bug_indentation,
+            self._bug_variable_name,
+            self._bug_operator,
+            self._bug_comparison,
+        )
+        self._rng = np.random.default_rng(self.data_config.augmentation_seed)
 
     def load_raw_data(self) -> Dict[str, List[Dict]]:
         """Load raw Python code data from multiple sources"""
@@ -29,8 +48,9 @@ class CodeDataProcessor:
 
         # Option 1: Use HuggingFace CodeSearchNet dataset
         try:
-            dataset = load_dataset("code_search_net", "python", split="train")
-            print(f"Loaded {len(dataset)} samples from CodeSearchNet")
+            # Streamed so rows past max_samples are never downloaded or materialized
+            dataset = load_dataset("code_search_net", "python", split="train", streaming=True)
+            print("Streaming samples from CodeSearchNet")
             return self._process_codesearchnet(dataset)
         except:
             print("Could not load from HuggingFace, using synthetic data generation...")
@@ -44,7 +64,13 @@ class CodeDataProcessor:
             "fix_bug": []
         }
 
-        for item in tqdm(dataset, desc="Processing samples"):
+        for i, item in enumerate(tqdm(dataset, desc="Processing samples")):
+            # Draw augmentation decisions and bug types in blocks rather than per row
+            j = i % AUG_BLOCK_SIZE
+            if j == 0:
+                augment_mask = (self._rng.random(AUG_BLOCK_SIZE) < 0.3).tolist()
+                bug_indices = self._rng.integers(0, len(self._bug_types), size=AUG_BLOCK_SIZE).tolist()
+
             code = item.get("func_code_string", "")
             docstring = item.get("func_documentation_string", "")
 
@@ -72,8 +98,8 @@ class CodeDataProcessor:
                 })
 
             # Bug fix task (create synthetic bugs)
-            if self.data_config.use_augmentation and random.random() < 0.3:
-                buggy_code, fix_desc = self._introduce_bug(code)
+            if self.data_config.use_augmentation and augment_mask[j]:
+                buggy_code, fix_desc = self._introduce_bug(code, bug_indices[j])
                 if buggy_code:
                     processed_data["fix_bug"].append({
                         "input": buggy_code,
@@ -139,25 +165,31 @@ class CodeDataProcessor:
         ]
 
         # Expand with variations
-        data = {"explain": [], "document": [], "fix_bug": []}
-
-        for sample in synthetic_samples * 200:  # Repeat to create larger dataset
-            code = sample["code"]
+        repeats = 200  # Repeat to create larger dataset
+
+        # Documentation and explanation pairs are identical on every repeat,
+        # so each entry is built once and shared
+        data = {
+            "explain": [
+                {"input": sample["code"], "output": sample["explanation"], "task": "explain"}
+                for sample in synthetic_samples
+            ] * repeats,
+            "document": [
+                {"input": sample["code"], "output": sample["doc"], "task": "document"}
+                for sample in synthetic_samples
+            ] * repeats,
+            "fix_bug": []
+        }
 
-            data["document"].append({
-                "input": code,
-                "output": sample["doc"],
-                "task": "document"
-            })
+        bug_indices = self._rng.integers(
+            0, len(self._bug_types), size=len(synthetic_samples) * repeats
+        ).tolist()
 
-            data["explain"].append({
-                "input": code,
-                "output": sample["explanation"],
-                "task": "explain"
-            })
+        for sample, bug_idx in zip(chain.from_iterable(repeat(synthetic_samples, repeats)), bug_indices):
+            code = sample["code"]
 
-            # Create buggy versions
-            buggy_code, fix = self._introduce_bug(code)
+            # Create buggy versions (random, so repeats give different variants)
+            buggy_code, fix = self._introduce_bug(code, bug_idx)
             if buggy_code:
                 data["fix_bug"].append({
                     "input": buggy_code,
@@ -170,22 +202,16 @@ class CodeDataProcessor:
     def _clean_code(self, code: str) -> str:
         """Clean and normalize code"""
         # Remove excessive whitespace
-        code = re.sub(r'\n\s*\n', '\n\n', code)
+        code = _BLANK_LINES_RE.sub('\n\n', code)
         # Remove trailing whitespace
         code = '\n'.join(line.rstrip() for line in code.split('\n'))
         return code.strip()
 
-    def _introduce_bug(self, code: str) -> Tuple[Optional[str], str]:
+    def _introduce_bug(self, code: str, bug_idx: Optional[int] = None) -> Tuple[Optional[str], str]:
         """Introduce common Python bugs for training bug-fix task"""
-        bug_types = [
-            self._bug_indentation,
-            self._bug_variable_name,
-            self._bug_operator,
-            self._bug_comparison,
-        ]
-
-        bug_func = random.choice(bug_types)
-        return bug_func(code)
+        if bug_idx is None:
+            bug_idx = int(self._rng.integers(len(self._bug_types)))
+        return self._bug_types[bug_idx](code)
 
     def _bug_indentation(self, code: str) -> Tuple[Optional[str], str]:
         """Introduce indentation error"""
@@ -194,7 +220,7 @@ class CodeDataProcessor:
             return None, ""
 
         # Add extra indent to a random line
-        idx = random.randint(1, len(lines) - 1)
+        idx = int(self._rng.integers(1, len(lines)))
         if lines[idx].strip():
             lines[idx] = "    " + lines[idx]
             return '\n'.join(lines), "Fixed indentation error"
@@ -203,9 +229,9 @@ class CodeDataProcessor:
     def _bug_variable_name(self, code: str) -> Tuple[Optional[str], str]:
         """Introduce undefined variable"""
         # Change variable name in one place
-        matches = re.findall(r'\b([a-z_][a-z0-9_]*)\b', code)
+        matches = _IDENT_RE.findall(code)
         if len(matches) > 2:
-            var = matches[random.randint(0, len(matches) - 1)]
+            var = matches[self._rng.integers(len(matches))]
             buggy = code.replace(var, var + "_typo", 1)
             return buggy, f"Fixed undefined variable '{var}_typo'"
         return None, ""
@@ -239,7 +265,7 @@ class CodeDataProcessor:
             all_samples.extend(samples)
 
         # Shuffle
-        random.shuffle(all_samples)
+        self._rng.shuffle(all_samples)
 
         # Split
         n = len(all_samples)
@@ -266,8 +292,15 @@ class CodeDataProcessor:
 
     def _save_jsonl(self, data: List[Dict], filepath: str):
         """Save data in JSONL format"""
-        with jsonlines.open(filepath, mode='w') as writer:
-            writer.write_all(data)
+        with open(filepath, 'wb') as f:
+            if ORJSON_AVAILABLE:
+                for item in data:
+                    f.write(orjson.dumps(item))
+                    f.write(b'\n')
+            else:
+                for item in data:
+                    f.write(json.dumps(item).encode('utf-8'))
+                    f.write(b'\n')
 
     def load_dataset_for_training(self, split: str) -> Dataset:
         """Load preprocessed dataset for training"""
@@ -277,10 +310,9 @@ class CodeDataProcessor:
             "test": self.config.test_data_path
         }[split]
 
-        data = []
-        with jsonlines.open(filepath) as reader:
-            for item in reader:
-                data.append(item)
+        loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+        with open(filepath, 'rb') as f:
+            data = [loads(line) for line in f if line.strip()]
 
         return Dataset.from_list(data)
 
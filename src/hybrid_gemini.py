@@ -3,12 +3,20 @@ Improved Hybrid AI Code Assistant
 Fixed prompts for better output quality
 """
 
-import torch
 import os
+import re
 import sys
+import json
+import time
+import queue
+import hashlib
+import threading
+import importlib.util
+from string import Template
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
-from transformers import AutoTokenizer, T5ForConditionalGeneration
+from typing import Dict, Iterator, List, Tuple, Union
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -16,13 +24,26 @@ warnings.filterwarnings('ignore')
 root_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(root_dir))
 
+# google-genai is only imported once an API key is found
 try:
-    from google import genai
-    from google.genai import types
-    GEMINI_AVAILABLE = True
+    GEMINI_AVAILABLE = importlib.util.find_spec("google.genai") is not None
 except ImportError:
     GEMINI_AVAILABLE = False
 
+# torch and transformers take seconds to import and Gemini-only use never needs
+# them, so they are imported by _import_torch_backend() when the model is loaded
+torch = None
+AutoTokenizer = None
+T5ForConditionalGeneration = None
+
+
+def _import_torch_backend():
+    """Import torch and transformers into the module globals on first use"""
+    global torch, AutoTokenizer, T5ForConditionalGeneration
+    if torch is None:
+        from transformers import AutoTokenizer, T5ForConditionalGeneration
+        import torch
+
 # Import config
 try:
     from config import config
@@ -40,13 +61,227 @@ except ImportError:
         }
     config = MinimalConfig()
 
+# Concurrent fine-tuned requests arriving within this window share one generate call
+BATCH_WINDOW_S = 0.005
+MAX_BATCH_SIZE = 16
+
+# Remembers which Gemini model worked so startup doesn't re-probe every time
+GEMINI_MODEL_CACHE = Path.home() / ".cache" / "ai_code_assistant" / "gemini_model.json"
+GEMINI_MODEL_CACHE_TTL_S = 24 * 3600
+
+# Gemini response parsers: each scans the response once
+FIX_RESPONSE_RE = re.compile(r"FIXED_CODE:(.*?)EXPLANATION:(.*)", re.DOTALL)
+OPTIMIZE_RESPONSE_RE = re.compile(r"OPTIMIZED_CODE:(.*?)IMPROVEMENTS:(.*)", re.DOTALL)
+CODE_BLOCK_RE = re.compile(r"```(?:python)?(.*?)(?:```|$)", re.DOTALL)
+
+
+def extract_code_block(text: str) -> str:
+    """Return the contents of the first fenced code block, or the whole text if there is none"""
+    match = CODE_BLOCK_RE.search(text)
+    return (match.group(1) if match else text).strip()
+
+
+# Gemini prompt templates: built once, so the static text is byte-identical across calls
+_EXPLAIN_TMPL = Template("""You are explaining a piece of Python code.
+
+Code:
+```python
+${code}
+```
+
+Your task: Explain this code by:
+1. Describing the logic and flow
+2. Identifying any bugs or logical errors (like unreachable conditions)
+3. Explaining edge cases and potential issues
+4. Making it comprehensive and detailed
+
+Provide a 4-6 sentence explanation.
+
+Enhanced Explanation:""")
+
+_DOCUMENT_TMPL = Template("""Generate a professional Google-style docstring for this code.
+
+Code:
+```python
+${code}
+```
+
+IMPORTANT REQUIREMENTS:
+- ONE-LINE summary (concise, no fluff)
+- Brief description (2-3 sentences max)
+- Args section with parameter types and descriptions
+- Returns section with return type and description
+- NO code examples
+- NO lengthy explanations
+- Professional, concise format
+
+Format EXACTLY as:
+
+\"\"\"
+One-line summary of function purpose.
+
+Brief 2-3 sentence description of what it does and how.
+
+Args:
+    param_name (type): Concise description
+    another_param (type): Concise description
+
+Returns:
+    type: What is returned
+
+Raises:
+    ExceptionType: When raised (only if applicable)
+\"\"\"
+
+Docstring:""")
+
+_FIX_TMPL = Template("""Fix bugs in this Python code using the initial analysis provided.
+
+Buggy Code:
+```python
+${code}
+```
+
+Initial Analysis (from fine-tuned CodeT5 model):
+${finetuned_analysis}${error_context}
+
+Provide your response in this EXACT format:
+
+FIXED_CODE:
+```python
+[corrected code - properly indented]
+```
+
+EXPLANATION:
+## Bug Analysis
+[What was wrong with the code]
+
+## Solution Implemented
+[How the fix addresses the issue]
+
+## Key Improvements
+[Specific improvements made]
+
+Response:""")
+
+_OPTIMIZE_TMPL = Template("""Optimize this Python code using the initial suggestions provided.
+
+Original Code:
+```python
+${code}
+```
+
+Optimization Suggestions (from fine-tuned CodeT5 model):
+${finetuned_suggestions}
+
+Provide your response in this EXACT format with PROFESSIONAL HEADINGS:
+
+OPTIMIZED_CODE:
+```python
+[optimized code]
+```
+
+IMPROVEMENTS:
+## Performance Optimizations
+Describe performance improvements in paragraph form.
+
+## Code Quality Improvements
+Describe readability improvements in paragraph form.
+
+## Best Practices Applied
+Describe best practices in paragraph form.
+
+Response:""")
+
+_TESTS_TMPL = Template("""Generate comprehensive pytest unit tests for this Python code.
+
+Code:
+```python
+${code}
+```
+
+Test Outline (from fine-tuned CodeT5 model):
+${finetuned_tests}
+
+Include:
+- Test normal/expected cases
+- Test edge cases (boundary values)
+- Test error cases
+
+Return ONLY the complete test code (imports + test functions).
+
+Test code:""")
+
+# ONNX Runtime beats PyTorch only on short inputs
+ONNX_MAX_INPUT_TOKENS = 256
+
 
 class HybridGeminiAssistant:
     """Hybrid AI Assistant with improved prompts"""
     
-    def __init__(self, model_path: str = None):
-        """Initialize hybrid assistant"""
+    def __init__(self, model_path: str = None, quality: str = "fast", compile_model: bool = True,
+                 use_finetuned: bool = None):
+        """
+        Initialize hybrid assistant
+        
+        quality="fast" decodes greedily; "balanced" re-enables beam search.
+        compile_model compiles the model's forward pass when running on GPU.
+        use_finetuned=False runs Gemini only (without importing torch); by default
+        the fine-tuned model is loaded when model_path exists.
+        """
         self.model_path = model_path or config.output_dir
+        self.quality = quality
+        self.model = None
+        self.onnx_model = None
+        
+        if use_finetuned is None:
+            use_finetuned = os.path.isdir(self.model_path)
+        if use_finetuned:
+            self._load_finetuned_model(compile_model)
+        else:
+            print(f"ℹ️ Fine-tuned model not used ({self.model_path} not found or disabled) - Gemini only")
+        
+        # Initialize Gemini
+        self.gemini_client = None
+        self.gemini_model = None
+        self.use_gemini = False
+        
+        if GEMINI_AVAILABLE:
+            api_key = os.getenv("GEMINI_API_KEY")
+            if api_key:
+                try:
+                    print(f"🔑 API Key detected: {api_key[:10]}...{api_key[-5:]}")
+                    from google import genai
+                    self.gemini_client = genai.Client(api_key=api_key)
+                    
+                    key_hash = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+                    model_name = self._load_cached_gemini_model(key_hash)
+                    if model_name:
+                        print(f"✅ Google Gemini initialized - Using {model_name} (cached)")
+                    else:
+                        model_names = ["gemini-2.0-flash", "gemini-2.5-flash-lite", "gemini-2.5-flash"]
+                        print("🔍 Testing Gemini models...")
+                        model_name = self._probe_gemini_models(model_names)
+                        if model_name:
+                            self._save_cached_gemini_model(key_hash, model_name)
+                            print(f"✅ Google Gemini initialized - Using {model_name}")
+                    
+                    if model_name:
+                        self.gemini_model = model_name
+                        self.use_gemini = True
+                    else:
+                        print("⚠️ Could not initialize any Gemini model")
+                        
+                except Exception as e:
+                    print(f"⚠️ Gemini initialization error: {e}")
+                    self.use_gemini = False
+            else:
+                print("⚠️ GEMINI_API_KEY not found")
+                self.use_gemini = False
+    
+    def _load_finetuned_model(self, compile_model: bool):
+        """Load the fine-tuned model and start its generation worker"""
+        _import_torch_backend()
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
         # Load fine-tuned model
@@ -62,218 +297,331 @@ class HybridGeminiAssistant:
                 local_files_only=True,
                 trust_remote_code=True
             )
-            self.model.to(self.device)
-            self.model.eval()
+            self._prepare_model()
+            loaded_path = self.model_path
             print(f"✅ Fine-tuned model loaded on {self.device}")
         except Exception as e:
             checkpoint_path = os.path.join(self.model_path, "checkpoint-24390")
             if os.path.exists(checkpoint_path):
                 self.tokenizer = AutoTokenizer.from_pretrained(checkpoint_path)
                 self.model = T5ForConditionalGeneration.from_pretrained(checkpoint_path)
-                self.model.to(self.device)
-                self.model.eval()
+                self._prepare_model()
+                loaded_path = checkpoint_path
                 print(f"✅ Model loaded from checkpoint on {self.device}")
             else:
                 raise Exception(f"Could not load model from {self.model_path}")
         
-        # Initialize Gemini
-        self.gemini_client = None
-        self.gemini_model = None
-        self.use_gemini = False
+        # Tokenize each task prefix once. The trailing space is dropped because BPE
+        # attaches it to the following word, which is tokenized with a leading space.
+        self._prefix_ids = {
+            task: self.tokenizer(prefix.rstrip(), add_special_tokens=False)["input_ids"]
+            for task, prefix in config.task_prefix.items()
+        }
+        # Repeat requests on the same code (e.g. explain then document) skip tokenization
+        self._encode_cached = lru_cache(maxsize=256)(self._encode_input)
         
-        if GEMINI_AVAILABLE:
-            api_key = os.getenv("GEMINI_API_KEY")
-            if api_key:
+        # Optional ONNX Runtime copy of the model for short inputs (USE_ONNX=1)
+        if os.getenv("USE_ONNX"):
+            self._load_onnx_model(loaded_path)
+        
+        # Background micro-batcher for fine-tuned generation
+        self._batch_queue = queue.Queue()
+        threading.Thread(target=self._batch_worker, daemon=True).start()
+        
+        if compile_model:
+            self._compile_model()
+    
+    def _probe_gemini_model(self, model_name: str) -> bool:
+        """Check that a Gemini model answers a trivial request"""
+        try:
+            self.gemini_client.models.generate_content(model=model_name, contents="Hello")
+            print(f"   {model_name}: ✅ WORKS!")
+            return True
+        except Exception as e:
+            print(f"   {model_name}: ❌ {str(e)[:50]}...")
+            return False
+    
+    def _probe_gemini_models(self, model_names: List[str]) -> str:
+        """Probe all models concurrently and return the most preferred one that works"""
+        executor = ThreadPoolExecutor(max_workers=len(model_names))
+        try:
+            futures = [executor.submit(self._probe_gemini_model, name) for name in model_names]
+            # Walk in preference order; a success means lower-priority probes don't matter
+            for model_name, future in zip(model_names, futures):
+                if future.result():
+                    return model_name
+            return None
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _load_cached_gemini_model(self, key_hash: str) -> str:
+        """Return the cached working model for this API key if verified within the TTL"""
+        try:
+            with open(GEMINI_MODEL_CACHE, 'r') as f:
+                cached = json.load(f)
+            if (cached.get("key_hash") == key_hash
+                    and time.time() - cached.get("verified_at", 0) < GEMINI_MODEL_CACHE_TTL_S):
+                return cached.get("model")
+        except (OSError, ValueError):
+            pass
+        return None
+    
+    def _save_cached_gemini_model(self, key_hash: str, model_name: str):
+        """Record the working model so later processes skip probing"""
+        try:
+            GEMINI_MODEL_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            with open(GEMINI_MODEL_CACHE, 'w') as f:
+                json.dump({"model": model_name, "key_hash": key_hash, "verified_at": time.time()}, f)
+        except OSError as e:
+            print(f"⚠️ Could not cache Gemini model choice: {e}")
+    
+    def _prepare_model(self):
+        """Move the model to its device at reduced precision and switch to eval mode"""
+        if self.device.type == "cuda":
+            # BF16 keeps FP32's exponent range, avoiding T5's FP16 overflow in attention
+            dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+            self.model.to(self.device, dtype=dtype)
+        else:
+            # Dynamic int8 on the Linear layers, which dominate T5's CPU time
+            try:
+                self.model = torch.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            except Exception as e:
+                print(f"⚠️ Int8 quantization unavailable, using FP32: {e}")
+        self.model.eval()
+    
+    def _load_onnx_model(self, model_path: str):
+        """Export the model to ONNX Runtime with all graph fusions and IO binding"""
+        try:
+            import onnxruntime as ort
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError:
+            print("⚠️ USE_ONNX is set but optimum[onnxruntime] is not installed")
+            return
+        
+        try:
+            session_options = ort.SessionOptions()
+            session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            provider = "CUDAExecutionProvider" if self.device.type == "cuda" else "CPUExecutionProvider"
+            self.onnx_model = ORTModelForSeq2SeqLM.from_pretrained(
+                model_path,
+                export=True,
+                provider=provider,
+                session_options=session_options,
+                use_io_binding=self.device.type == "cuda"
+            )
+            print(f"✅ ONNX Runtime model ready ({provider})")
+        except Exception as e:
+            self.onnx_model = None
+            print(f"⚠️ ONNX export failed, using PyTorch only: {e}")
+    
+    def _compile_model(self):
+        """Compile the forward pass (GPU only), falling back to eager mode"""
+        if self.device.type != "cuda" or not hasattr(torch, "compile"):
+            return
+        
+        eager_forward = self.model.forward
+        try:
+            # Default mode, no CUDA graphs: generate() grows the KV cache every step, so
+            # graph capture would record a new graph per length. dynamic=True compiles
+            # shape-generic kernels once instead of recompiling per sequence length.
+            self.model.forward = torch.compile(eager_forward, dynamic=True)
+            
+            # Warm up so compilation happens now, not on the first request
+            for _ in range(2):
+                self._generate_finetuned("def add(a, b):\n    return a + b", "explain", max_length=16)
+            print("✅ Model compiled with torch.compile")
+        except Exception as e:
+            self.model.forward = eager_forward
+            print(f"⚠️ torch.compile failed, using eager mode: {e}")
+    
+    def _encode_input(self, input_text: str, task: str) -> Tuple[int, ...]:
+        """Token ids of the cached task prefix + input, with special tokens"""
+        budget = config.max_source_length - self.tokenizer.num_special_tokens_to_add()
+        ids = self.tokenizer(" " + input_text, add_special_tokens=False)["input_ids"]
+        return tuple(self.tokenizer.build_inputs_with_special_tokens((self._prefix_ids.get(task, []) + ids)[:budget]))
+    
+    def _generate_finetuned(self, input_text: str, task: str, max_length: int = 128,
+                            quality: str = None) -> str:
+        """
+        Generate using fine-tuned model (greedy unless quality="balanced")
+        
+        Requests from concurrent threads are batched into one generate call.
+        """
+        return self._submit_finetuned(input_text, task, max_length, quality).result()
+    
+    def _submit_finetuned(self, input_text: str, task: str, max_length: int = 128,
+                          quality: str = None) -> Future:
+        """Queue a fine-tuned generation and return a Future for its output"""
+        future = Future()
+        if self.model is None:
+            future.set_result("(fine-tuned model not loaded)")
+            return future
+        self._batch_queue.put((input_text, task, max_length, quality or self.quality, future))
+        return future
+    
+    def _batch_worker(self):
+        """Collect requests for up to BATCH_WINDOW_S and run them as batched generate calls"""
+        while True:
+            batch = [self._batch_queue.get()]
+            deadline = time.monotonic() + BATCH_WINDOW_S
+            while len(batch) < MAX_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
                 try:
-                    print(f"🔑 API Key detected: {api_key[:10]}...{api_key[-5:]}")
-                    self.gemini_client = genai.Client(api_key=api_key)
-                    
-                    model_names = ["gemini-2.0-flash", "gemini-2.5-flash-lite", "gemini-2.5-flash"]
-                    
-                    print("🔍 Testing Gemini models...")
-                    for model_name in model_names:
-                        try:
-                            print(f"   Trying {model_name}...", end=" ")
-                            response = self.gemini_client.models.generate_content(
-                                model=model_name,
-                                contents="Hello"
-                            )
-                            
-                            if hasattr(response, 'text') and response.text:
-                                text = response.text
-                            elif hasattr(response, 'candidates') and response.candidates:
-                                text = response.candidates[0].content.parts[0].text
-                            else:
-                                text = str(response)
-                            
-                            self.gemini_model = model_name
-                            self.use_gemini = True
-                            print(f"✅ WORKS!")
-                            print(f"✅ Google Gemini initialized - Using {model_name}")
-                            break
-                            
-                        except Exception as e:
-                            print(f"❌ {str(e)[:50]}...")
-                            continue
-                    
-                    if not self.use_gemini:
-                        print("⚠️ Could not initialize any Gemini model")
-                        
+                    batch.append(self._batch_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            # Decoding settings apply to a whole generate call, so group by them.
+            # Tokenizing here also keeps the (not thread-safe) fast tokenizer on one thread.
+            groups = {}
+            for input_text, task, max_length, quality, future in batch:
+                try:
+                    ids = self._encode_cached(input_text, task)
                 except Exception as e:
-                    print(f"⚠️ Gemini initialization error: {e}")
-                    self.use_gemini = False
-            else:
-                print("⚠️ GEMINI_API_KEY not found")
-                self.use_gemini = False
+                    # Fail just this request; the worker must stay alive for the others
+                    future.set_exception(e)
+                    continue
+                groups.setdefault((max_length, quality), []).append((ids, future))
+            
+            for (max_length, quality), items in groups.items():
+                try:
+                    outputs = self._generate_ids([ids for ids, _ in items], max_length, quality)
+                    for (_, future), output in zip(items, outputs):
+                        future.set_result(output)
+                except Exception as e:
+                    for _, future in items:
+                        future.set_exception(e)
     
-    def _generate_finetuned(self, input_text: str, task: str, max_length: int = 128) -> str:
-        """Generate using fine-tuned model"""
-        prefix = config.task_prefix.get(task, "")
-        full_input = prefix + input_text
+    def _generate_ids(self, batch_ids: List[Tuple[int, ...]], max_length: int, quality: str) -> List[str]:
+        """Run one generate call over a batch of token id sequences"""
+        # Pad to the longest sequence, rounded up to a tensor-core friendly multiple of 8
+        width = max(len(ids) for ids in batch_ids)
+        width += -width % 8
+        pad_id = self.tokenizer.pad_token_id
+        input_ids = torch.tensor([list(ids) + [pad_id] * (width - len(ids)) for ids in batch_ids])
+        attention_mask = torch.tensor([[1] * len(ids) + [0] * (width - len(ids)) for ids in batch_ids])
+        
+        # The basic output only seeds the Gemini step, so beams are opt-in
+        # The per-step n-gram ban is costly with beams, so greedy decoding uses the
+        # cheaper repetition penalty instead
+        if quality == "balanced":
+            decode_kwargs = {"num_beams": config.num_beams, "early_stopping": True,
+                             "no_repeat_ngram_size": 4, "encoder_no_repeat_ngram_size": 0}
+        else:
+            decode_kwargs = {"num_beams": 1, "do_sample": False,
+                             "no_repeat_ngram_size": 0, "repetition_penalty": 1.15}
+        
+        # Short inputs go to ONNX Runtime when it is loaded
+        model = self.onnx_model if self.onnx_model is not None and width < ONNX_MAX_INPUT_TOKENS else self.model
         
-        inputs = self.tokenizer(
-            full_input,
-            max_length=config.max_source_length,
-            padding="max_length",
-            truncation=True,
-            return_tensors="pt"
-        ).to(self.device)
+        # Pinned host memory lets the copy to the GPU overlap with kernel launches
+        if self.device.type == "cuda":
+            input_ids = input_ids.pin_memory().to(self.device, non_blocking=True)
+            attention_mask = attention_mask.pin_memory().to(self.device, non_blocking=True)
         
-        with torch.no_grad():
-            outputs = self.model.generate(
-                **inputs,
+        with torch.inference_mode():
+            outputs = model.generate(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
                 max_length=max_length,
-                num_beams=config.num_beams,
-                early_stopping=True,
-                no_repeat_ngram_size=3
+                use_cache=True,
+                **decode_kwargs
             )
         
-        return self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
     
-    def _generate_gemini(self, prompt: str, max_retries: int = 2) -> str:
-        """Generate using Google Gemini"""
+    def _generate_gemini_stream(self, prompt: str, max_retries: int = 2) -> Iterator[str]:
+        """Stream a Google Gemini response chunk by chunk as it is generated"""
         if not self.use_gemini or not self.gemini_client:
-            return "AI unavailable. Set GEMINI_API_KEY."
+            yield "AI unavailable. Set GEMINI_API_KEY."
+            return
         
         for attempt in range(max_retries):
+            started = False
             try:
-                response = self.gemini_client.models.generate_content(
+                for chunk in self.gemini_client.models.generate_content_stream(
                     model=self.gemini_model,
                     contents=prompt
-                )
-                
-                if hasattr(response, 'text') and response.text:
-                    return response.text.strip()
-                elif hasattr(response, 'candidates') and response.candidates:
-                    return response.candidates[0].content.parts[0].text.strip()
-                
-                return str(response).strip()
+                ):
+                    text = getattr(chunk, 'text', None)
+                    if not started and text:
+                        text = text.lstrip()
+                    if text:
+                        started = True
+                        yield text
+                return
                     
             except Exception as e:
-                if attempt < max_retries - 1:
+                # Chunks already handed to the caller can't be taken back, so only
+                # retry if nothing has been yielded yet
+                if attempt < max_retries - 1 and not started:
                     continue
-                return f"Error: {str(e)[:100]}"
-        
-        return "Failed after retries."
+                yield f"Error: {str(e)[:100]}"
+                return
+    
+    def _generate_gemini(self, prompt: str, max_retries: int = 2) -> str:
+        """Generate using Google Gemini"""
+        return "".join(self._generate_gemini_stream(prompt, max_retries)).rstrip()
     
-    def explain_code(self, code: str, detailed: bool = False) -> str:
+    def explain_code(self, code: str, detailed: bool = False, stream: bool = False) -> Union[str, Iterator[str]]:
         """
         Explain code - First use fine-tuned model, then enhance with Gemini
         Returns comprehensive explanation with both basic and enhanced insights
+        With stream=True, returns an iterator of text chunks as Gemini produces them
         """
-        # Step 1: Get basic explanation from fine-tuned model
+        chunks = self._explain_code_chunks(code)
+        return chunks if stream else "".join(chunks).rstrip()
+    
+    def _explain_code_chunks(self, code: str) -> Iterator[str]:
+        """Yield the formatted explanation, streaming the Gemini part"""
+        # Step 1: Get basic explanation from fine-tuned model (runs in the background)
         print("🤖 Step 1: Getting basic explanation from fine-tuned model...")
-        basic_explanation = self._generate_finetuned(code, "explain", max_length=512)
+        basic_future = self._submit_finetuned(code, "explain", max_length=512)
         
         if self.use_gemini:
-            # Step 2: Enhance with Gemini
+            # Step 2: Gemini explains the code directly, in parallel with the fine-tuned model
             print("✨ Step 2: Enhancing explanation with Gemini AI...")
             
-            prompt = f"""You are enhancing a code explanation. Here's what we have:
-
-Code:
-```python
-{code}
-```
-
-Basic Explanation (from fine-tuned model):
-{basic_explanation}
-
-Your task: Enhance this explanation by:
-1. Expanding on the logic and flow
-2. Identifying any bugs or logical errors (like unreachable conditions)
-3. Explaining edge cases and potential issues
-4. Making it more comprehensive and detailed
-
-Provide an enhanced 4-6 sentence explanation that builds upon the basic one.
-
-Enhanced Explanation:"""
+            prompt = _EXPLAIN_TMPL.substitute(code=code)
             
-            enhanced = self._generate_gemini(prompt)
-            return f"""💡 Code Explanation
+            enhanced = self._generate_gemini_stream(prompt)
+            first_chunk = next(enhanced, "")  # Waits for Gemini while the local model runs
+            basic_explanation = basic_future.result()
+            
+            yield f"""💡 Code Explanation
 
 📝 Basic Explanation :
 {basic_explanation}
 
 ✨ Enhanced Explanation :
-{enhanced}"""
+"""
+            yield first_chunk
+            yield from enhanced
         else:
             # Only fine-tuned model available
-            return f"💡 Code Explanation\n\n{basic_explanation}"
+            yield f"💡 Code Explanation\n\n{basic_future.result()}"
     
     def generate_documentation(self, code: str, style: str = "google") -> str:
         """
         Generate documentation - Hybrid approach using fine-tuned model + Gemini
         Returns professional documentation with Args, Returns, and proper structure
         """
-        # Step 1: Get basic documentation from fine-tuned model
+        # Step 1: Get basic documentation from fine-tuned model (runs in the background)
         print("🤖 Step 1: Generating basic documentation from fine-tuned model...")
-        basic_docs = self._generate_finetuned(code, "document", max_length=1024)
+        basic_future = self._submit_finetuned(code, "document", max_length=1024)
         
         if self.use_gemini:
-            # Step 2: Enhance with Gemini for professional format
+            # Step 2: Gemini writes the docstring in parallel with the fine-tuned model
             print("✨ Step 2: Formatting professional documentation with Gemini AI...")
             
-            prompt = f"""Generate a professional Google-style docstring for this code.
-
-Code:
-```python
-{code}
-```
-
-Basic analysis from fine-tuned model:
-{basic_docs}
-
-IMPORTANT REQUIREMENTS:
-- ONE-LINE summary (concise, no fluff)
-- Brief description (2-3 sentences max)
-- Args section with parameter types and descriptions
-- Returns section with return type and description
-- NO code examples
-- NO lengthy explanations
-- Professional, concise format
-
-Format EXACTLY as:
-
-\"\"\"
-One-line summary of function purpose.
-
-Brief 2-3 sentence description of what it does and how.
-
-Args:
-    param_name (type): Concise description
-    another_param (type): Concise description
-
-Returns:
-    type: What is returned
-
-Raises:
-    ExceptionType: When raised (only if applicable)
-\"\"\"
-
-Docstring:"""
+            prompt = _DOCUMENT_TMPL.substitute(code=code)
             
             enhanced = self._generate_gemini(prompt)
+            basic_docs = basic_future.result()
             
             # Clean up the response
             if '"""' in enhanced:
@@ -292,7 +640,7 @@ Docstring:"""
 {enhanced}"""
         else:
             # Only fine-tuned model available
-            return f"📚 Documentation\n\n{basic_docs}"
+            return f"📚 Documentation\n\n{basic_future.result()}"
     
     def fix_bug(self, code: str, error_msg: str = None) -> Dict[str, str]:
         """Fix bugs using hybrid approach - fine-tuned model analysis + Gemini correction"""
@@ -305,50 +653,15 @@ Docstring:"""
             print("✨ Step 2: Generating fix with Gemini AI...")
             error_context = f"\n\nError message: {error_msg}" if error_msg else ""
             
-            prompt = f"""Fix bugs in this Python code using the initial analysis provided.
-
-Buggy Code:
-```python
-{code}
-```
-
-Initial Analysis (from fine-tuned CodeT5 model):
-{finetuned_analysis}{error_context}
-
-Provide your response in this EXACT format:
-
-FIXED_CODE:
-```python
-[corrected code - properly indented]
-```
-
-EXPLANATION:
-## Bug Analysis
-[What was wrong with the code]
-
-## Solution Implemented
-[How the fix addresses the issue]
-
-## Key Improvements
-[Specific improvements made]
-
-Response:"""
+            prompt = _FIX_TMPL.substitute(code=code, finetuned_analysis=finetuned_analysis, error_context=error_context)
             
             result = self._generate_gemini(prompt)
             
             # Parse response
-            if "FIXED_CODE:" in result and "EXPLANATION:" in result:
-                parts = result.split("EXPLANATION:")
-                fixed_code = parts[0].replace("FIXED_CODE:", "").strip()
-                explanation = parts[1].strip()
-                
-                # Clean markdown
-                if "```python" in fixed_code:
-                    fixed_code = fixed_code.split("```python")[1].split("```")[0].strip()
-                elif "```" in fixed_code:
-                    code_parts = fixed_code.split("```")
-                    if len(code_parts) >= 2:
-                        fixed_code = code_parts[1].strip()
+            match = FIX_RESPONSE_RE.search(result)
+            if match:
+                fixed_code = extract_code_block(match.group(1))
+                explanation = match.group(2).strip()
                 
                 return {
                     "fixed_code": fixed_code,
@@ -357,13 +670,7 @@ Response:"""
                 }
             else:
                 # Fallback parsing
-                if "```python" in result:
-                    fixed_code = result.split("```python")[1].split("```")[0].strip()
-                elif "```" in result:
-                    parts = result.split("```")
-                    fixed_code = parts[1].strip() if len(parts) >= 2 else result
-                else:
-                    fixed_code = result
+                fixed_code = extract_code_block(result)
                 
                 return {
                     "fixed_code": fixed_code,
@@ -389,50 +696,15 @@ Response:"""
             # Step 2: Apply optimizations with Gemini
             print("✨ Step 2: Applying optimizations with Gemini AI...")
             
-            prompt = f"""Optimize this Python code using the initial suggestions provided.
-
-Original Code:
-```python
-{code}
-```
-
-Optimization Suggestions (from fine-tuned CodeT5 model):
-{finetuned_suggestions}
-
-Provide your response in this EXACT format with PROFESSIONAL HEADINGS:
-
-OPTIMIZED_CODE:
-```python
-[optimized code]
-```
-
-IMPROVEMENTS:
-## Performance Optimizations
-Describe performance improvements in paragraph form.
-
-## Code Quality Improvements
-Describe readability improvements in paragraph form.
-
-## Best Practices Applied
-Describe best practices in paragraph form.
-
-Response:"""
+            prompt = _OPTIMIZE_TMPL.substitute(code=code, finetuned_suggestions=finetuned_suggestions)
             
             result = self._generate_gemini(prompt)
             
             # Parse
-            if "OPTIMIZED_CODE:" in result and "IMPROVEMENTS:" in result:
-                parts = result.split("IMPROVEMENTS:")
-                opt_code = parts[0].replace("OPTIMIZED_CODE:", "").strip()
-                improvements = parts[1].strip()
-                
-                # Clean markdown
-                if "```python" in opt_code:
-                    opt_code = opt_code.split("```python")[1].split("```")[0].strip()
-                elif "```" in opt_code:
-                    code_parts = opt_code.split("```")
-                    if len(code_parts) >= 2:
-                        opt_code = code_parts[1].strip()
+            match = OPTIMIZE_RESPONSE_RE.search(result)
+            if match:
+                opt_code = extract_code_block(match.group(1))
+                improvements = match.group(2).strip()
                 
                 return {
                     "optimized_code": opt_code,
@@ -440,13 +712,7 @@ Response:"""
                     "method": f"Hybrid (CodeT5 + Gemini {self.gemini_model})"
                 }
             else:
-                if "```python" in result:
-                    opt_code = result.split("```python")[1].split("```")[0].strip()
-                elif "```" in result:
-                    parts = result.split("```")
-                    opt_code = parts[1].strip() if len(parts) >= 2 else result
-                else:
-                    opt_code = result
+                opt_code = extract_code_block(result)
                 
                 return {
                     "optimized_code": opt_code,
@@ -472,34 +738,12 @@ Response:"""
             # Step 2: Generate comprehensive tests with Gemini
             print("✨ Step 2: Generating comprehensive tests with Gemini AI...")
             
-            prompt = f"""Generate comprehensive pytest unit tests for this Python code.
-
-Code:
-```python
-{code}
-```
-
-Test Outline (from fine-tuned CodeT5 model):
-{finetuned_tests}
-
-Include:
-- Test normal/expected cases
-- Test edge cases (boundary values)
-- Test error cases
-
-Return ONLY the complete test code (imports + test functions).
-
-Test code:"""
+            prompt = _TESTS_TMPL.substitute(code=code, finetuned_tests=finetuned_tests)
             
             result = self._generate_gemini(prompt)
             
             # Clean markdown
-            if "```python" in result:
-                result = result.split("```python")[1].split("```")[0].strip()
-            elif "```" in result:
-                parts = result.split("```")
-                if len(parts) >= 2:
-                    result = parts[1].strip()
+            result = extract_code_block(result)
             
             # Add header showing hybrid approach
             result = f"# Generated using Hybrid Approach (CodeT5 + Gemini {self.gemini_model})\n# CodeT5 Outline: {finetuned_tests[:100]}...\n\n{result}"
@@ -3,10 +3,16 @@ Improved Hybrid RAG Assistant
 Only adds codebase context when actually helpful
 """
 
-from src.hybrid_gemini import HybridGeminiAssistant
+from src.hybrid_gemini import HybridGeminiAssistant, FIX_RESPONSE_RE, OPTIMIZE_RESPONSE_RE, extract_code_block
 from src.codebase_retrieval import CodebaseRetrieval
 from typing import Dict, List
 
+# Minimum cosine similarity of the best retrieved snippet before it is added to the
+# prompt. Mean-pooled CodeBERT embeddings of unrelated Python functions already score
+# around 0.8-0.95, so only near-duplicates of the submitted code pass.
+FIX_CONTEXT_MIN_SIMILARITY = 0.97
+OPTIMIZE_CONTEXT_MIN_SIMILARITY = 0.95
+
 
 class HybridRAGAssistant(HybridGeminiAssistant):
     """RAG Assistant that only adds context when relevant"""
@@ -52,8 +58,8 @@ class HybridRAGAssistant(HybridGeminiAssistant):
             except:
                 pass
         
-        # If we have very similar working code (similarity > 0.7), use it for context
-        if similar_code and similar_code[0]['similarity_score'] > 0.7:
+        # If we have very similar working code, use it for context
+        if similar_code and similar_code[0]['similarity_score'] > FIX_CONTEXT_MIN_SIMILARITY:
             examples = "\n\nSimilar working code from your codebase for reference:\n"
             for result in similar_code[:1]:  # Just use best match
                 examples += f"```python\n{result['code'][:300]}\n```\n"
@@ -83,17 +89,10 @@ Response:"""
                 
                 result = self._generate_gemini(prompt)
                 
-                if "FIXED_CODE:" in result and "EXPLANATION:" in result:
-                    parts = result.split("EXPLANATION:")
-                    fixed_code = parts[0].replace("FIXED_CODE:", "").strip()
-                    explanation = parts[1].strip()
-                    
-                    if "```python" in fixed_code:
-                        fixed_code = fixed_code.split("```python")[1].split("```")[0].strip()
-                    elif "```" in fixed_code:
-                        code_parts = fixed_code.split("```")
-                        if len(code_parts) >= 2:
-                            fixed_code = code_parts[1].strip()
+                match = FIX_RESPONSE_RE.search(result)
+                if match:
+                    fixed_code = extract_code_block(match.group(1))
+                    explanation = match.group(2).strip()
                     
                     return {
                         "fixed_code": fixed_code,
@@ -117,7 +116,7 @@ Response:"""
                 pass
         
         # If we have similar code with good patterns
-        if similar_code and similar_code[0]['similarity_score'] > 0.6:
+        if similar_code and similar_code[0]['similarity_score'] > OPTIMIZE_CONTEXT_MIN_SIMILARITY:
             patterns = "\n\nOptimization patterns from your codebase:\n"
             for result in similar_code[:1]:
                 patterns += f"```python\n{result['code'][:300]}\n```\n"
@@ -145,17 +144,10 @@ Response:"""
                 
                 result = self._generate_gemini(prompt)
                 
-                if "OPTIMIZED_CODE:" in result and "IMPROVEMENTS:" in result:
-                    parts = result.split("IMPROVEMENTS:")
-                    opt_code = parts[0].replace("OPTIMIZED_CODE:", "").strip()
-                    improvements = parts[1].strip()
-                    
-                    if "```python" in opt_code:
-                        opt_code = opt_code.split("```python")[1].split("```")[0].strip()
-                    elif "```" in opt_code:
-                        code_parts = opt_code.split("```")
-                        if len(code_parts) >= 2:
-                            opt_code = code_parts[1].strip()
+                match = OPTIMIZE_RESPONSE_RE.search(result)
+                if match:
+                    opt_code = extract_code_block(match.group(1))
+                    improvements = match.group(2).strip()
                     
                     return {
                         "optimized_code": opt_code,
@@ -168,11 +160,12 @@ Response:"""
     
     def get_codebase_stats(self) -> Dict:
         """Get codebase statistics"""
-        if self.retrieval_enabled and self.retriever.metadata:
-            files = set(m['file'] for m in self.retriever.metadata)
+        # Read the column once; a background reindex may replace it meanwhile
+        snippet_files = self.retriever.files if self.retrieval_enabled else []
+        if snippet_files:
             return {
-                'total_snippets': len(self.retriever.metadata),
-                'total_files': len(files),
+                'total_snippets': len(snippet_files),
+                'total_files': len(set(snippet_files)),
                 'indexed': True
             }
         return {
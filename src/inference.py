@@ -33,42 +33,53 @@ class CodeAssistant:
                   temperature: float = None,
                   num_beams: int = None) -> str:
         """Generate output for given input"""
+        return self._generate_batch([input_text], task, max_length=max_length,
+                                    temperature=temperature, num_beams=num_beams)[0]
+
+    def _generate_batch(self, input_texts: List[str], task: str,
+                        max_length: int = None,
+                        temperature: float = None,
+                        num_beams: int = None,
+                        batch_size: int = 16) -> List[str]:
+        """Generate outputs for several inputs of the same task, batch_size at a time"""
         # Add task prefix
         prefix = config.task_prefix.get(task, "")
-        full_input = prefix + input_text
+        full_inputs = [prefix + input_text for input_text in input_texts]
 
         # Use config defaults if not specified
         max_length = max_length or config.max_target_length
         temperature = temperature or config.temperature
         num_beams = num_beams or config.num_beams
 
-        # Tokenize
-        inputs = self.tokenizer(
-            full_input,
-            max_length=config.max_source_length,
-            padding="max_length",
-            truncation=True,
-            return_tensors="pt"
-        ).to(self.device)
-
-        # Generate
-        with torch.no_grad():
-            outputs = self.model.generate(
-                **inputs,
-                max_length=max_length,
-                num_beams=num_beams,
-                temperature=temperature,
-                top_p=config.top_p,
-                early_stopping=True,
-                no_repeat_ngram_size=3
+        generated_texts = []
+        for start in range(0, len(full_inputs), batch_size):
+            # Tokenize (padded to the longest input in the batch)
+            inputs = self.tokenizer(
+                full_inputs[start:start + batch_size],
+                max_length=config.max_source_length,
+                padding=True,
+                truncation=True,
+                return_tensors="pt"
+            ).to(self.device)
+
+            # Generate
+            with torch.no_grad():
+                outputs = self.model.generate(
+                    **inputs,
+                    max_length=max_length,
+                    num_beams=num_beams,
+                    temperature=temperature,
+                    top_p=config.top_p,
+                    early_stopping=True,
+                    no_repeat_ngram_size=3
+                )
+
+            # Decode
+            generated_texts.extend(
+                self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
             )
 
-        # Decode
-        generated_text = self.tokenizer.decode(
-            outputs[0], skip_special_tokens=True
-        )
-
-        return generated_text
+        return generated_texts
 
     def explain_code(self, code: str, detailed: bool = False) -> str:
         """
@@ -81,9 +92,24 @@ class CodeAssistant:
         Returns:
             Natural language explanation
         """
+        return self.explain_code_batch([code], detailed=detailed)[0]
+
+    def explain_code_batch(self, codes: List[str], detailed: bool = False,
+                           batch_size: int = 16) -> List[str]:
+        """
+        Generate natural language explanations for several snippets
+
+        Args:
+            codes: Python code snippets to explain
+            detailed: If True, generate more detailed explanations
+            batch_size: Number of snippets per generate call
+
+        Returns:
+            Natural language explanations, in input order
+        """
         max_length = 256 if detailed else 128
-        explanation = self._generate(code, "explain", max_length=max_length)
-        return explanation
+        return self._generate_batch(codes, "explain", max_length=max_length,
+                                    batch_size=batch_size)
 
     def generate_documentation(self, code: str, style: str = "google") -> str:
         """
@@ -96,15 +122,30 @@ class CodeAssistant:
         Returns:
             Generated docstring
         """
-        doc = self._generate(code, "document")
+        return self.generate_documentation_batch([code], style=style)[0]
+
+    def generate_documentation_batch(self, codes: List[str], style: str = "google",
+                                     batch_size: int = 16) -> List[str]:
+        """
+        Generate docstrings for several snippets
+
+        Args:
+            codes: Python code snippets to document
+            style: Documentation style (google, numpy, sphinx)
+            batch_size: Number of snippets per generate call
+
+        Returns:
+            Generated docstrings, in input order
+        """
+        docs = self._generate_batch(codes, "document", batch_size=batch_size)
 
         # Format according to style
         if style == "google":
-            doc = self._format_google_docstring(code, doc)
+            docs = [self._format_google_docstring(code, doc) for code, doc in zip(codes, docs)]
         elif style == "numpy":
-            doc = self._format_numpy_docstring(code, doc)
+            docs = [self._format_numpy_docstring(code, doc) for code, doc in zip(codes, docs)]
 
-        return doc
+        return docs
 
     def fix_bug(self, code: str, error_msg: str = None) -> Dict[str, str]:
         """
@@ -117,23 +158,42 @@ class CodeAssistant:
         Returns:
             Dictionary with fixed code and explanation
         """
-        # Analyze code for common issues
-        issues = self._detect_issues(code)
+        return self.fix_bug_batch([code], error_msg=error_msg)[0]
 
-        # Generate fix
-        fixed_code = self._generate(code, "fix_bug")
+    def fix_bug_batch(self, codes: List[str], error_msg: str = None,
+                      batch_size: int = 16) -> List[Dict[str, str]]:
+        """
+        Suggest bug fixes for several snippets
 
-        # Generate explanation
-        explanation = f"Detected issues: {', '.join(issues)}" if issues else "No obvious issues detected."
+        Args:
+            codes: Python code snippets with potential bugs
+            error_msg: Optional error message to help diagnose
+            batch_size: Number of snippets per generate call
 
-        if error_msg:
-            explanation += f"\nError message: {error_msg}"
+        Returns:
+            Dictionaries with fixed code and explanation, in input order
+        """
+        # Generate fixes
+        fixed_codes = self._generate_batch(codes, "fix_bug", batch_size=batch_size)
 
-        return {
-            "fixed_code": fixed_code,
-            "explanation": explanation,
-            "detected_issues": issues
-        }
+        results = []
+        for code, fixed_code in zip(codes, fixed_codes):
+            # Analyze code for common issues
+            issues = self._detect_issues(code)
+
+            # Generate explanation
+            explanation = f"Detected issues: {', '.join(issues)}" if issues else "No obvious issues detected."
+
+            if error_msg:
+                explanation += f"\nError message: {error_msg}"
+
+            results.append({
+                "fixed_code": fixed_code,
+                "explanation": explanation,
+                "detected_issues": issues
+            })
+
+        return results
 
     def optimize_code(self, code: str) -> Dict[str, str]:
         """
@@ -58,6 +58,19 @@ def test_bug_fixing(assistant):
     assert isinstance(result["fixed_code"], str)
 
 
+def test_batch_generation(assistant):
+    """Test batched generation returns one output per input, in order"""
+    codes = [SAMPLE_CODE, "def add(a, b):\n    return a + b"]
+
+    explanations = assistant.explain_code_batch(codes, batch_size=1)
+    assert len(explanations) == len(codes)
+    assert all(isinstance(e, str) for e in explanations)
+
+    fixes = assistant.fix_bug_batch(codes)
+    assert len(fixes) == len(codes)
+    assert all("fixed_code" in f for f in fixes)
+
+
 def test_code_optimization(assistant):
     """Test code optimization"""
     result = assistant.optimize_code(SAMPLE_CODE)